@@ -0,0 +1,319 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+"""
+==================================================
+SQLite storage for the book log
+==================================================
+An optional backend for logs that outgrow one in-memory frame. The
+workbook is imported into a local database in a single transaction, with
+indexes on the filter columns, a book x genre join table and an FTS5
+table for search. Every dashboard query is a parameterized statement that
+selects only the columns and the page it needs.
+"""
+
+# Bump this whenever the schema or the imported columns change, the next start re-imports
+SCHEMA_VERSION = 1
+
+# Book log column -> database column, for the columns the dashboard shows
+BOOK_COLUMNS = {
+    "Book": "book",
+    "Author": "author",
+    "Status": "status",
+    "Rec?": "rec",
+    "Recommended By": "recommended_by",
+    "Rating": "rating",
+    "Start Date": "start_date",
+    "End Date": "end_date",
+    "Summary": "summary",
+    "Core Themes": "core_themes",
+    "Review": "review",
+    "What I gained from reading": "gained",
+    "Story behind finding the book": "story",
+    "Genre": "genre",
+    "Personal Collection?": "collection",
+    "Series/Standalone?": "series",
+    "Page Ct.": "pages",
+    "Book Link": "link",
+}
+
+# Filled in from the book log when it is imported, only used for filtering and grouping
+DERIVED_COLUMNS = ["slug", "start_year", "start_month", "end_year", "end_month", "read_from", "read_to", "rating_bin", "end_month_number"]
+
+SEARCH_COLUMNS = ["book", "author", "genre", "summary", "core_themes", "review", "gained", "story"]
+
+TABLE_COLUMNS = ["Status", "Book", "Author", "Rating", "Recommended By", "Start Date", "End Date", "Book Link"]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,  -- Row position in the book log
+    {", ".join(f"{column} {'REAL' if column == 'rating' else 'TEXT'}" for column in BOOK_COLUMNS.values())},
+    slug TEXT NOT NULL UNIQUE,
+    start_year INTEGER,
+    start_month TEXT,
+    end_year INTEGER,
+    end_month TEXT,
+    read_from TEXT,  -- First day the book was being read, the end date when only that is known
+    read_to TEXT,  -- Last day, far in the future while the book is still being read
+    rating_bin INTEGER,  -- Half point rating bin, -1 when unrated
+    end_month_number INTEGER  -- Months since January 1970 of the end date
+);
+CREATE INDEX IF NOT EXISTS books_status ON books (status);
+CREATE INDEX IF NOT EXISTS books_rec ON books (rec);
+CREATE INDEX IF NOT EXISTS books_start_date ON books (start_date);
+CREATE INDEX IF NOT EXISTS books_end_date ON books (end_date);
+CREATE INDEX IF NOT EXISTS books_read_from ON books (read_from);
+CREATE INDEX IF NOT EXISTS books_read_to ON books (read_to);
+
+CREATE TABLE IF NOT EXISTS book_genres (
+    genre TEXT NOT NULL,
+    book_id INTEGER NOT NULL REFERENCES books (id),
+    PRIMARY KEY (genre, book_id)
+) WITHOUT ROWID;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS book_text USING fts5 (
+    {", ".join(SEARCH_COLUMNS)},
+    content='books', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def connect(path):
+    connection = sqlite3.connect(path, timeout=60, isolation_level=None)  # Transactions are explicit
+    connection.execute("PRAGMA journal_mode = WAL")  # Readers keep the old log while an import runs
+    return connection
+
+
+def stored_key(path):
+    if not os.path.exists(path):
+        return None
+    connection = connect(path)
+    try:
+        connection.executescript(SCHEMA)
+        row = connection.execute("SELECT value FROM meta WHERE key = 'book_log_key'").fetchone()
+        return json.loads(row[0]) if row else None
+    finally:
+        connection.close()
+
+
+def import_book_log(path, rows, genres, key):
+    # rows has one column per BOOK_COLUMNS value and DERIVED_COLUMNS, genres one entry per (book position, genre)
+    key = dict(key, schema=SCHEMA_VERSION)
+    connection = connect(path)
+    try:
+        connection.executescript(SCHEMA)
+        connection.execute("BEGIN IMMEDIATE")  # One writer, readers see the old log until the commit
+
+        # Another worker may have imported the same workbook while we waited for the lock
+        row = connection.execute("SELECT value FROM meta WHERE key = 'book_log_key'").fetchone()
+        if row and json.loads(row[0]) == key:
+            connection.execute("ROLLBACK")
+            return False
+
+        connection.execute("INSERT INTO book_text (book_text) VALUES ('delete-all')")
+        connection.execute("DELETE FROM book_genres")
+        connection.execute("DELETE FROM books")
+
+        columns = list(BOOK_COLUMNS.values()) + DERIVED_COLUMNS
+        values = rows[columns].astype(object).where(rows[columns].notna(), None)
+        connection.executemany(
+            f"INSERT INTO books (id, {', '.join(columns)}) VALUES (?, {', '.join('?' * len(columns))})",
+            ((position, *row) for position, row in enumerate(values.itertuples(index=False))),
+        )
+        connection.executemany(
+            "INSERT OR IGNORE INTO book_genres (genre, book_id) VALUES (?, ?)",
+            zip(genres.astype(str), genres.index.astype(int)),
+        )
+        connection.execute("INSERT INTO book_text (book_text) VALUES ('rebuild')")
+
+        version = connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        connection.execute("INSERT OR REPLACE INTO meta VALUES ('book_log_key', ?)", (json.dumps(key),))
+        connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(int(version[0]) + 1 if version else 1),))
+        connection.execute("COMMIT")
+        return True
+    except BaseException:
+        if connection.in_transaction:
+            connection.execute("ROLLBACK")
+        raise
+    finally:
+        connection.close()
+
+
+class ConnectionPool:
+    # Read-only connections for one worker process, each used by one thread at a time
+    def __init__(self, path, maxsize=8):
+        self.path = path
+        self.maxsize = maxsize
+        self.idle = queue.LifoQueue()
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+
+    def open(self):
+        connection = sqlite3.connect(f"file:{quote(os.path.abspath(self.path))}?mode=ro", uri=True, check_same_thread=False)
+        connection.execute("PRAGMA query_only = ON")
+        return connection
+
+    @contextmanager
+    def connection(self):
+        with self.lock:
+            if self.pid != os.getpid():  # Forked into a new worker, the parent's connections are not ours
+                self.idle = queue.LifoQueue()
+                self.pid = os.getpid()
+        try:
+            connection = self.idle.get_nowait()
+        except queue.Empty:
+            connection = self.open()
+
+        try:
+            yield connection
+        finally:
+            if self.idle.qsize() < self.maxsize:
+                self.idle.put(connection)
+            else:
+                connection.close()
+
+
+"""
+--------------------------------------------------
+Queries
+--------------------------------------------------
+Filters arrive as a dict with the same meaning as the in-memory callbacks:
+status, rec, years, months (paired with the years when pair_months is set),
+genres with genre_match "any"/"all", a first_day/last_day ISO date range and
+the search words. Missing or empty values leave that filter off, except an
+empty status list, which matches nothing like the status dropdown does.
+"""
+
+def in_list(column, values, params):
+    params.extend(values)
+    return f"{column} IN ({', '.join('?' * len(values))})"
+
+
+def where_clause(filters):
+    conditions, params = [], []
+
+    if filters.get("status") is not None:
+        conditions.append(in_list("status", filters["status"], params))
+    if filters.get("rec"):
+        conditions.append(in_list("rec", filters["rec"], params))
+
+    years, months = filters.get("years"), filters.get("months")
+    if years:
+        conditions.append(f"({in_list('start_year', years, params)} OR {in_list('end_year', years, params)})")
+    if months and years and filters.get("pair_months"):
+        conditions.append(
+            f"(({in_list('start_year', years, params)} AND {in_list('start_month', months, params)})"
+            f" OR ({in_list('end_year', years, params)} AND {in_list('end_month', months, params)}))"
+        )
+    elif months:
+        conditions.append(f"({in_list('start_month', months, params)} OR {in_list('end_month', months, params)})")
+
+    genres = filters.get("genres")
+    if genres:
+        genre_books = f"SELECT book_id FROM book_genres WHERE {in_list('genre', genres, params)}"
+        if filters.get("genre_match") == "all":
+            genre_books += " GROUP BY book_id HAVING COUNT(*) = ?"
+            params.append(len(set(genres)))
+        conditions.append(f"id IN ({genre_books})")
+
+    # Interval overlap, only books with dates can match
+    if filters.get("last_day"):
+        conditions.append("read_from <= ?")
+        params.append(filters["last_day"])
+    if filters.get("first_day"):
+        conditions.append("read_to >= ?")
+        params.append(filters["first_day"])
+    if filters.get("first_day") or filters.get("last_day"):
+        conditions.append("read_from IS NOT NULL")
+
+    return (" WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+
+def search_source(filters):
+    # Every word must match, exactly or as a prefix, ranked with FTS5's bm25
+    words = filters.get("words")
+    if not words:
+        return "books", []
+    match = " ".join(f'"{word}"*' for word in words)
+    return "books JOIN (SELECT rowid AS id, bm25(book_text) AS rank FROM book_text WHERE book_text MATCH ?) USING (id)", [match]
+
+
+def version(connection):
+    row = connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def count_books(connection, filters):
+    source, source_params = search_source(filters)
+    where, params = where_clause(filters)
+    return connection.execute(f"SELECT COUNT(*) FROM {source}{where}", source_params + params).fetchone()[0]
+
+
+def table_page(connection, filters, sort_by, offset, limit):
+    source, source_params = search_source(filters)
+    where, params = where_clause(filters)
+
+    if sort_by:
+        column = BOOK_COLUMNS[sort_by["column_id"]]
+        if sort_by["direction"] == "desc":
+            # Ties come out in reverse log order, the missing values stay at the bottom in log order
+            order = f"{column} IS NULL, {column} DESC, CASE WHEN {column} IS NULL THEN id ELSE -id END"
+        else:
+            order = f"{column} IS NULL, {column}, id"
+    elif filters.get("words"):
+        order = "rank, id"
+    else:
+        order = "id"
+
+    selected = ", ".join(f'{BOOK_COLUMNS[column]} AS "{column}"' for column in TABLE_COLUMNS)
+    cursor = connection.execute(
+        f"SELECT {selected} FROM {source}{where} ORDER BY {order} LIMIT ? OFFSET ?",
+        source_params + params + [limit, offset],
+    )
+    return pd.DataFrame(cursor.fetchall(), columns=TABLE_COLUMNS)
+
+
+def rating_counts(connection, filters, bins):
+    where, params = where_clause(filters)
+    where = (where + " AND" if where else " WHERE") + " rating_bin >= 0"
+    counts = np.zeros(bins, dtype=np.int64)
+    for rating_bin, books in connection.execute(f"SELECT rating_bin, COUNT(*) FROM books{where} GROUP BY rating_bin", params):
+        counts[rating_bin] = books
+    return counts
+
+
+def month_counts(connection, filters):
+    # (first month, books per month from there on) with the empty months at zero
+    where, params = where_clause(filters)
+    where = (where + " AND" if where else " WHERE") + " end_month_number IS NOT NULL"
+    rows = connection.execute(f"SELECT end_month_number, COUNT(*) FROM books{where} GROUP BY end_month_number", params).fetchall()
+    if not rows:
+        return 0, np.zeros(0, dtype=np.int64)
+
+    months, books = np.array(rows, dtype=np.int64).T
+    first = int(months.min())
+    return first, np.bincount(months - first, weights=books).astype(np.int64)
+
+
+def book_by_slug(connection, slug):
+    selected = ", ".join(f'{column} AS "{name}"' for name, column in BOOK_COLUMNS.items())
+    cursor = connection.execute(f"SELECT {selected} FROM books WHERE slug = ?", (slug,))
+    row = cursor.fetchone()
+    return dict(zip(BOOK_COLUMNS, row)) if row else None
+
+
+def home_options(connection):
+    years = [row[0] for row in connection.execute("SELECT DISTINCT start_year FROM books WHERE start_year IS NOT NULL ORDER BY 1")]
+    genres = [row[0] for row in connection.execute("SELECT DISTINCT genre FROM book_genres ORDER BY 1")]
+    bounds = connection.execute("SELECT MIN(read_from), MAX(MAX(read_from), COALESCE(MAX(end_date), MAX(read_from))) FROM books").fetchone()
+    return years, genres, bounds
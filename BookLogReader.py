@@ -0,0 +1,95 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import pandas as pd
+from openpyxl import load_workbook
+
+"""
+==================================================
+Streaming reader for the book log workbook
+==================================================
+pd.read_excel builds the whole sheet, every column, as Python objects before
+anything is dropped. This reader walks the sheet with openpyxl's read-only
+iter_rows instead: only the book log columns are kept, blank rows are skipped
+as they stream past, and every CHUNK_ROWS rows are turned into typed columns
+so the Python objects never outlive one chunk. A workbook with several book
+log sheets (one per year, say) has each sheet parsed in its own process.
+"""
+
+# The columns the dashboard reads, anything else in the sheet (M-Y, scratch columns) is skipped
+LOG_COLUMNS = [
+    "Rating", "Book", "Author", "Status", "Rec?", "Recommended By", "Start Date", "End Date",
+    "Summary", "Core Themes", "Review", "What I gained from reading", "Story behind finding the book",
+    "Genre", "Personal Collection?", "Series/Standalone?", "Page Ct.",
+]
+
+CHUNK_ROWS = 10_000
+
+# Text read_excel treats as missing by default, so both readers give the same frame
+NA_STRINGS = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+}
+
+
+def cell_value(value):
+    if isinstance(value, str) and value in NA_STRINGS:
+        return None
+    return value
+
+
+def typed_chunk(rows, columns):
+    # pandas infers each column's dtype, text lands in Arrow backed strings rather than Python objects
+    return pd.DataFrame.from_records(rows, columns=columns)
+
+
+def book_sheets(workbook):
+    # Sheets whose header row names the book column, in workbook order
+    return [sheet.title for sheet in workbook.worksheets if "Book" in next(sheet.iter_rows(max_row=1, values_only=True), ())]
+
+
+def sheet_frame(sheet, columns=LOG_COLUMNS, chunk_rows=CHUNK_ROWS):
+    header = list(next(sheet.iter_rows(max_row=1, values_only=True), ()))
+    positions = [header.index(column) if column in header else None for column in columns]
+    last_column = max((position for position in positions if position is not None), default=0) + 1
+
+    chunks, rows = [], []
+    for row in sheet.iter_rows(min_row=2, max_col=last_column, values_only=True):
+        values = [cell_value(row[position]) if position is not None and position < len(row) else None for position in positions]
+        if all(value is None for value in values):
+            continue  # Blank row, or one holding only formulas outside the log columns
+
+        rows.append(values)
+        if len(rows) == chunk_rows:
+            chunks.append(typed_chunk(rows, columns))
+            rows = []
+    if rows or not chunks:
+        chunks.append(typed_chunk(rows, columns))
+
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+
+def read_sheet(path, sheet_name):
+    # Runs in a pool process, which opens its own read-only handle on the workbook
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        return sheet_frame(workbook[sheet_name])
+    finally:
+        workbook.close()
+
+
+def read_book_log(path, max_workers=None):
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheets = book_sheets(workbook)
+        if not sheets:
+            raise ValueError(f"No sheet in {path} has a 'Book' column")
+        if len(sheets) == 1:
+            return sheet_frame(workbook[sheets[0]])
+    finally:
+        workbook.close()
+
+    with ProcessPoolExecutor(max_workers=min(len(sheets), max_workers or os.cpu_count() or 1)) as pool:
+        frames = list(pool.map(read_sheet, repeat(path), sheets))
+    return pd.concat(frames, ignore_index=True)
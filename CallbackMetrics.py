@@ -0,0 +1,113 @@
+import json
+import logging
+import threading
+import time
+from functools import wraps
+
+"""
+==================================================
+Callback latency and payload metrics
+==================================================
+instrument_callbacks() wraps every server callback registered on a Dash app
+and records wall time, rows in/out and the size of the serialized response
+as Prometheus histograms. Callbacks report their row counts with
+note_rows(); when instrumentation is off nothing is wrapped and note_rows()
+returns straight away.
+"""
+
+logger = logging.getLogger("LocalBookTracker.metrics")
+
+DURATION_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5]
+BYTES_BUCKETS = [256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304]
+ROWS_BUCKETS = [1, 10, 100, 1000, 10000, 100000, 1000000]
+
+enabled = False
+current = threading.local()  # Row counts reported by the callback running on this thread
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series = {}  # label value -> [bucket counts..., +Inf count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, label, value):
+        with self.lock:
+            series = self.series.setdefault(label, [0] * (len(self.buckets) + 2))
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[position] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self, label_name):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for label, series in sorted(self.series.items()):
+                label = label.replace("\\", "\\\\").replace('"', '\\"')
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f'{self.name}_bucket{{{label_name}="{label}",le="{bound}"}} {count}')
+                lines.append(f'{self.name}_bucket{{{label_name}="{label}",le="+Inf"}} {series[-2]}')
+                lines.append(f'{self.name}_sum{{{label_name}="{label}"}} {series[-1]}')
+                lines.append(f'{self.name}_count{{{label_name}="{label}"}} {series[-2]}')
+        return lines
+
+
+durations = Histogram("dash_callback_duration_seconds", "Wall time of Dash callbacks.", DURATION_BUCKETS)
+response_bytes = Histogram("dash_callback_response_bytes", "Size of the serialized callback response.", BYTES_BUCKETS)
+rows_in = Histogram("dash_callback_rows_in", "Book rows a callback worked over.", ROWS_BUCKETS)
+rows_out = Histogram("dash_callback_rows_out", "Book rows a callback sent back.", ROWS_BUCKETS)
+
+
+def note_rows(rows_considered, rows_returned):
+    if enabled:
+        current.rows = (rows_considered, rows_returned)
+
+
+def instrumented(callback_id, function, slow_ms):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        current.rows = None
+        started = time.perf_counter()
+        response = function(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+
+        size = len(response) if isinstance(response, (str, bytes)) else 0
+        durations.observe(callback_id, elapsed)
+        response_bytes.observe(callback_id, size)
+        if current.rows is not None:
+            rows_in.observe(callback_id, current.rows[0])
+            rows_out.observe(callback_id, current.rows[1])
+
+        if elapsed * 1000 >= slow_ms:
+            logger.warning(json.dumps({
+                "event": "slow_callback",
+                "callback": callback_id,
+                "duration_ms": round(elapsed * 1000, 2),
+                "response_bytes": size,
+                "rows_in": current.rows[0] if current.rows else None,
+                "rows_out": current.rows[1] if current.rows else None,
+            }))
+        return response
+    return wrapper
+
+
+def instrument_callbacks(app, slow_ms=250):
+    global enabled
+    enabled = True
+
+    # callback_map holds Dash's wrapped callbacks, which return the serialized JSON response
+    for callback_id, callback in app.callback_map.items():
+        if "callback" not in callback:
+            continue  # Clientside callbacks run in the browser, there is nothing to time here
+        callback["callback"] = instrumented(callback_id, callback["callback"], slow_ms)
+
+
+def render_metrics(extra_lines=()):
+    lines = []
+    for histogram in (durations, response_bytes, rows_in, rows_out):
+        lines.extend(histogram.render("callback"))
+    lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,169 @@
+import cProfile
+import html
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+from functools import wraps
+
+import CallbackMetrics
+
+"""
+==================================================
+Per-request callback profiling
+==================================================
+profile_callbacks() wraps every server callback like CallbackMetrics does,
+but runs a sample of the requests under cProfile, and optionally
+tracemalloc. Dash's wrapped callback returns the serialized response, so a
+profile covers the filtering, the figure or record building and the JSON
+encoding. Requests slower than min_ms leave a .pstats file per request
+(snakeviz, flameprof or gprof2dot turn it into a flame graph) and, with
+tracemalloc, a .memory.txt of the biggest allocations. index.html in the
+report folder lists the slowest requests and links their reports, only the
+KEEP_REPORTS slowest are kept on disk.
+"""
+
+KEEP_REPORTS = 100
+MEMORY_TOP = 25  # Allocation sites listed per request
+
+reports = []  # The slowest requests so far, slowest first
+reports_lock = threading.Lock()
+counter = 0
+
+# Python 3.12+ allows one active profiler per process, requests arriving while one is
+# profiled (Dash fires the home page callbacks together) simply run unprofiled
+profile_lock = threading.Lock()
+
+
+def report_name(callback_id):
+    global counter
+    with reports_lock:
+        counter += 1
+        number = counter
+    # Output ids like "..figure_a.figure...figure_b.figure.." become a readable file name
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{number:05d}-{re.sub(r'[^A-Za-z0-9]+', '-', callback_id).strip('-')[:80]}"
+
+
+def hottest_function(profile):
+    # The function with the most time spent in its own body, stats values are (calls, primitive calls, own time, ...)
+    (file_name, line, function), _ = max(pstats.Stats(profile).stats.items(), key=lambda item: item[1][2])
+    return f"{function} ({os.path.basename(file_name)}:{line})"
+
+
+def memory_report(before, after, peak_bytes):
+    lines = [f"Peak traced memory during the request: {peak_bytes / 1024:.1f} KiB", ""]
+    for stat in after.compare_to(before, "lineno")[:MEMORY_TOP]:
+        lines.append(str(stat))
+    return "\n".join(lines) + "\n"
+
+
+def write_index(folder):
+    rows = []
+    with reports_lock:
+        for report in reports:
+            links = f'<a href="{report["name"]}.pstats">pstats</a>'
+            if report["memory"]:
+                links += f' <a href="{report["name"]}.memory.txt">memory</a>'
+            rows.append(
+                f"<tr><td>{report['duration_ms']:.1f}</td><td>{html.escape(report['callback'])}</td>"
+                f"<td>{report['time']}</td><td>{report['response_bytes']}</td><td>{report['rows_in'] or ''}</td>"
+                f"<td>{report['rows_out'] or ''}</td><td>{html.escape(report['hottest'])}</td><td>{links}</td></tr>"
+            )
+    page = (
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Slowest callback requests</title></head>\n"
+        '<body style="font-family: Arial, sans-serif">\n<h1>Slowest callback requests</h1>\n'
+        "<p>Open a .pstats file with <code>python -m pstats</code>, snakeviz or flameprof.</p>\n"
+        '<table border="1" cellpadding="4" style="border-collapse: collapse">\n'
+        "<tr><th>ms</th><th>Callback</th><th>Time</th><th>Response bytes</th><th>Rows in</th><th>Rows out</th>"
+        "<th>Most time in</th><th>Reports</th></tr>\n" + "\n".join(rows) + "\n</table>\n</body></html>\n"
+    )
+    with open(os.path.join(folder, "index.html.tmp"), "w", encoding="utf-8") as index:
+        index.write(page)
+    os.replace(os.path.join(folder, "index.html.tmp"), os.path.join(folder, "index.html"))
+
+
+def save_report(folder, callback_id, elapsed, response, profile, memory):
+    name = report_name(callback_id)
+    profile.dump_stats(os.path.join(folder, f"{name}.pstats"))
+    if memory is not None:
+        with open(os.path.join(folder, f"{name}.memory.txt"), "w", encoding="utf-8") as report:
+            report.write(memory)
+
+    rows = getattr(CallbackMetrics.current, "rows", None)
+    report = {
+        "name": name,
+        "callback": callback_id,
+        "duration_ms": elapsed * 1000,
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "response_bytes": len(response) if isinstance(response, (str, bytes)) else 0,
+        "rows_in": rows[0] if rows else None,
+        "rows_out": rows[1] if rows else None,
+        "hottest": hottest_function(profile),
+        "memory": memory is not None,
+    }
+
+    # Only the slowest requests keep their files, so a long session does not fill the disk
+    with reports_lock:
+        reports.append(report)
+        reports.sort(key=lambda entry: -entry["duration_ms"])
+        dropped = reports[KEEP_REPORTS:]
+        del reports[KEEP_REPORTS:]
+    for entry in dropped:
+        for suffix in (".pstats", ".memory.txt"):
+            try:
+                os.remove(os.path.join(folder, entry["name"] + suffix))
+            except FileNotFoundError:
+                pass
+    write_index(folder)
+
+
+def profiled(callback_id, function, folder, sample_rate, min_ms, memory):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if random.random() >= sample_rate or not profile_lock.acquire(blocking=False):
+            return function(*args, **kwargs)
+
+        try:
+            CallbackMetrics.current.rows = None
+            before = None
+            if memory:
+                # tracemalloc is process wide, unprofiled requests running alongside show up in the report
+                before = tracemalloc.take_snapshot()
+                tracemalloc.reset_peak()
+                start_bytes = tracemalloc.get_traced_memory()[0]
+
+            profile = cProfile.Profile()
+            started = time.perf_counter()
+            profile.enable()
+            try:
+                response = function(*args, **kwargs)
+            finally:
+                profile.disable()
+            elapsed = time.perf_counter() - started
+
+            report = None
+            if memory and elapsed * 1000 >= min_ms:
+                report = memory_report(before, tracemalloc.take_snapshot(), tracemalloc.get_traced_memory()[1] - start_bytes)
+        finally:
+            profile_lock.release()
+
+        if elapsed * 1000 >= min_ms:
+            save_report(folder, callback_id, elapsed, response, profile, report)
+        return response
+    return wrapper
+
+
+def profile_callbacks(app, folder, sample_rate=1.0, min_ms=0, memory=False):
+    os.makedirs(folder, exist_ok=True)
+    CallbackMetrics.enabled = True  # So callbacks report their row counts through note_rows()
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    for callback_id, callback in app.callback_map.items():
+        if "callback" not in callback:
+            continue  # Clientside callbacks run in the browser
+        callback["callback"] = profiled(callback_id, callback["callback"], folder, sample_rate, min_ms, memory)
+
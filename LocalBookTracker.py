@@ -1,9 +1,112 @@
-from dash import Dash, html, dash_table, dcc, callback, Input, Output
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from itertools import count
+from urllib.parse import unquote
+
+from dash import Dash, html, dash_table, dcc, ctx, ClientsideFunction, Input, Output, State
+from dash.exceptions import MissingCallbackContextException
+from flask import Response, request
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import plotly.graph_objects as go  # Dash imports this anyway, plotly.express is only imported when a figure is built
+
+import BookDatabase
+import BookLogReader
+import CallbackMetrics
+import CallbackProfiler
+import StaticExport
+from CallbackMetrics import note_rows
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # The cache is optional, without pyarrow we always read the workbook
+    pa = None
+
+try:
+    import brotli
+except ImportError:  # Responses are gzipped instead
+    brotli = None
+
+DEFAULT_BOOK_LOG = 'GIT Local Book Tracker/Book Log.xlsx'
+
+# Bump this whenever preprocess() changes so old caches are thrown away
+CACHE_VERSION = 4
+SEARCH_CACHE_VERSION = 1  # Likewise for the saved search index and SearchIndex
+
+
+@dataclass
+class Config:
+    # The BOOK_LOG environment variable points the dashboard at another workbook, e.g. a benchmark log
+    log_path: str = field(default_factory=lambda: os.environ.get("BOOK_LOG", DEFAULT_BOOK_LOG))
+    rebuild_cache: bool = False
+    clientside: bool = False
+    metrics: bool = False
+    slow_callback_ms: float = 250
+    watch_interval: float = 5  # Seconds between checks for changes to the workbook, 0 disables hot reload
+    warm: bool = True  # Start loading the book log in the background as soon as the app is created
+    shared: bool = False  # Map the snapshot published by a loader process instead of reading the workbook
+    database: str = None  # Serve from this SQLite file, imported from the workbook, instead of from memory
+    tenants_dir: str = None  # Serve /u/<user>/ from <tenants_dir>/<user>/Book Log.xlsx
+    tenant_memory_mb: float = 1024  # Loaded tenants are evicted, least recently used first, past this estimate
+    compress: bool = True  # Brotli or gzip the callback and layout responses
+    profile: str = None  # Write cProfile reports of callback requests to this folder
+    profile_sample: float = 1.0  # Share of callback requests that run under the profiler
+    profile_min_ms: float = 0  # Profiled requests faster than this leave no report
+    profile_memory: bool = False  # Also trace allocations with tracemalloc
 
-df = pd.read_excel('GIT Local Book Tracker/Book Log.xlsx')
+
+parser = argparse.ArgumentParser(description="Local Book Tracking Analytics Dashboard")
+parser.add_argument("--log-path", help="Book log workbook to serve (defaults to $BOOK_LOG or the bundled path)")
+parser.add_argument("--rebuild-cache", action="store_true", help="Ignore the cached book log and re-read the workbook")
+parser.add_argument("--clientside", action="store_true", help="Ship the book log to the browser once and filter the home page there")
+parser.add_argument("--memory-report", action="store_true", help="Print the book log's memory use per column before and after the compact schema")
+parser.add_argument("--metrics", action="store_true", help="Time every callback and serve the numbers on /metrics")
+parser.add_argument("--slow-callback-ms", type=float, default=250, help="With --metrics, log callbacks slower than this")
+parser.add_argument("--watch-interval", type=float, default=5, help="Seconds between checks for changes to the workbook (0 disables hot reload)")
+parser.add_argument("--publish", action="store_true", help="Run as the loader for --shared workers: publish a snapshot whenever the workbook changes")
+parser.add_argument("--shared", action="store_true", help="Serve the snapshot published by a --publish loader, memory-mapped read-only")
+parser.add_argument("--database", metavar="PATH", help="Import the workbook into this SQLite file and query it instead of keeping the log in memory")
+parser.add_argument("--tenants-dir", metavar="DIR", help="Also serve every reader's log under /u/<user>/, read from DIR/<user>/Book Log.xlsx")
+parser.add_argument("--tenant-memory-mb", type=float, default=1024, help="With --tenants-dir, memory budget for the loaded tenants' book logs")
+parser.add_argument("--export", metavar="DIR", help="Write a static HTML copy of the dashboard and every book page to DIR and exit")
+parser.add_argument("--export-workers", type=int, help="With --export, processes that write the book pages (defaults to one per CPU)")
+parser.add_argument("--profile", metavar="DIR", nargs="?", const="profiles", help="Profile callback requests with cProfile and write per-request reports and an index.html to DIR (default: profiles)")
+parser.add_argument("--profile-sample", type=float, default=1.0, help="With --profile, share of callback requests to profile (0-1)")
+parser.add_argument("--profile-min-ms", type=float, default=0, help="With --profile, only keep reports of requests slower than this")
+parser.add_argument("--profile-memory", action="store_true", help="With --profile, also record each request's allocations with tracemalloc")
+parser.add_argument("--no-compress", action="store_true", help="Send callback and layout responses uncompressed, e.g. behind a proxy that compresses")
+
+
+def config_from_args(args):
+    config = Config(
+        rebuild_cache=args.rebuild_cache,
+        clientside=args.clientside,
+        metrics=args.metrics,
+        slow_callback_ms=args.slow_callback_ms,
+        watch_interval=args.watch_interval,
+        shared=args.shared,
+        database=args.database,
+        tenants_dir=args.tenants_dir,
+        tenant_memory_mb=args.tenant_memory_mb,
+        compress=not args.no_compress,
+        profile=args.profile,
+        profile_sample=args.profile_sample,
+        profile_min_ms=args.profile_min_ms,
+        profile_memory=args.profile_memory,
+    )
+    if args.log_path:
+        config.log_path = args.log_path
+    return config
 
 
 """
@@ -12,338 +115,295 @@ df = pd.read_excel('GIT Local Book Tracker/Book Log.xlsx')
 ==================================================
 """
 
-# Load and preprocess data
-df = df.iloc[:, 0:25]  
-df = df.dropna(how="all")  
-df["Rating"] = pd.to_numeric(df["Rating"], errors="coerce")
-df["Book Link"] = df["Book"].apply(lambda book: f"/book/{book.replace(' ', '_')}")
-df["Start Date"] = pd.to_datetime(df["Start Date"], errors="coerce")
-df["End Date"] = pd.to_datetime(df["End Date"], errors="coerce")
-df["Start Year"] = df["Start Date"].dt.year
-df["Start Month"] = df["Start Date"].dt.month_name()
-df["End Year"] = df["End Date"].dt.year
-df["End Month"] = df["End Date"].dt.month_name()
-
-year_options = [{"label": str(int(year)), "value": int(year)} for year in sorted(df["Start Year"].dropna().unique())]
-month_options = [{"label": month, "value": month} for month in [
+def ascii_lower(text):
+    # Strip accents so "Café" and "cafe" are the same word in slugs and search
+    return text.astype(str).fillna("").str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii").str.lower()
+
+
+def make_slugs(titles):
+    # Lowercase words joined by dashes, so titles with underscores or punctuation survive the URL
+    slugs = ascii_lower(titles).str.replace(r"[^a-z0-9]+", "-", regex=True).str.strip("-")
+    slugs = slugs.mask(slugs == "", "book")
+
+    # Repeated titles get -2, -3, ... in log order, skipping any slug another title already uses
+    taken = set(slugs)
+    repeats = slugs.groupby(slugs).cumcount()
+    for position in np.flatnonzero(repeats.to_numpy()):
+        number = repeats.iat[position] + 1
+        while f"{slugs.iat[position]}-{number}" in taken:
+            number += 1
+        slugs.iat[position] = f"{slugs.iat[position]}-{number}"
+        taken.add(slugs.iat[position])
+    return slugs
+
+
+MONTHS = [
     "January", "February", "March", "April", "May", "June", "July", "August", 
     "September", "October", "November", "December"
-]]
+]
 
-unique_genres = sorted(set(df["Genre"].dropna().str.split(", ").explode()))
+DATE_FORMAT = '%b %d, %Y'
 
+# Low cardinality text columns become categoricals, months keep calendar order and
+# years fit in a nullable small int. Dates stay datetime64 for the date math, their
+# display strings live in the snapshot's table_view() next to the frame.
+INGEST_SCHEMA = {
+    "Status": "category",
+    "Rec?": "category",
+    "Genre": "category",
+    "Personal Collection?": "category",
+    "Series/Standalone?": "category",
+    "Start Month": pd.CategoricalDtype(MONTHS, ordered=True),
+    "End Month": pd.CategoricalDtype(MONTHS, ordered=True),
+    "Start Year": "Int16",
+    "End Year": "Int16",
+}
 
-genre_options = [{"label": str(genre), "value": str(genre)} for genre in unique_genres]
 
-df['month_year'] = df['End Date'].dt.strftime('%Y-%m')
+def preprocess(df):
+    # Load and preprocess data
+    df = df.iloc[:, 0:25]  
+    df = df.dropna(how="all").reset_index(drop=True)
+    df["Rating"] = pd.to_numeric(df["Rating"], errors="coerce")
+    df["Book Link"] = "/book/" + make_slugs(df["Book"])
+    df["Start Date"] = pd.to_datetime(df["Start Date"], errors="coerce")
+    df["End Date"] = pd.to_datetime(df["End Date"], errors="coerce")
+    df["Start Year"] = df["Start Date"].dt.year
+    df["Start Month"] = df["Start Date"].dt.month_name()
+    df["End Year"] = df["End Date"].dt.year
+    df["End Month"] = df["End Date"].dt.month_name()
+    return df.astype(INGEST_SCHEMA)
 
-# print(df["month_year"])
 
-values_list = df.groupby(["month_year"]).size().reset_index(name="Book Count")
+def format_dates(dates):
+    return dates.dt.strftime(DATE_FORMAT)
 
-values_list.columns = ['Date', 'Books Read']
 
-values_list["Date"] = pd.to_datetime(values_list["Date"])
+def format_date(date):
+    return date.strftime(DATE_FORMAT) if pd.notna(date) else "nan"
 
-# print(unique_genres)
 
+def markdown_links(links, home="/"):
+    # The table's "More Info" cells, built for the whole log at once rather than per page
+    return "[More Info](" + home + links.str.slice(1) + ")"
 
-df["Start Date"] = df["Start Date"].dt.strftime('%b %d, %Y')  
-df["End Date"] = df["End Date"].dt.strftime('%b %d, %Y')  
 
-bookspermonth = px.line(values_list, x='Date', y='Books Read', title='Books Read Per Month', markers=True)
+# Table columns whose display form differs from the frame, the rest are shown as they are
+DISPLAY_COLUMNS = ["Start Date", "End Date", "Book Link"]
 
-bookspermonth.update_layout(
-    title={
-        'text': 'Books Read Per Month',  # Title text
-        'font': {
-            'family': 'Arial, sans-serif',  # Font type
-            'size': 24,  # Font size
-            'color': 'black',  # Font color
-            'weight': 'bold'  # Font weight
-        },
-        'x': 0.5,  # Center the title horizontally
-        'xanchor': 'center'  # Align the title to the center
-    },
-    yaxis=dict(
-        showticklabels=True,  # Show labels on the y-axis
-        showgrid=False,  # Remove grid lines
-        zeroline=False,  # Hide the zero line
-        title="Books Read"  # Set y-axis title
-    ),
-    xaxis=dict(
-        showgrid=True,  # Keep grid on the x-axis
-        zeroline=True,  # Show the zero line
-        linecolor="black"  # Change x-axis line color to black
-    ),
-    plot_bgcolor='white',  # Set the background color of the plot area
-    paper_bgcolor='white',  # Set the background color of the entire figure
-    hoverlabel=dict(
-        bgcolor="rgba(255,255,255,0.7)",  # Slightly transparent background for hover
-        font_size=14,  # Font size for hover label
-        font_family="Arial, sans-serif",  # Font for hover label
-        font_color="black"  # Hover label text color
-    ),
-    margin=dict(t=40, b=30, l=40, r=40),  # Adjust margins for compactness
-    hovermode="closest",  # More responsive hover
-    legend=dict(
-        visible=False  # Hide the legend
-    )
-)
 
-# Update the line thickness
-bookspermonth.update_traces(line=dict(width=7, color = 'navy'), marker=dict(size=15, symbol = 'circle'))  # Line thickness and marker size
+def table_view(df, home="/"):
+    # The table's columns exactly as they are sent, so a callback only gathers its page by row position
+    return df[[column["id"] for column in TABLE_COLUMNS]].assign(**{
+        "Start Date": format_dates(df["Start Date"]),
+        "End Date": format_dates(df["End Date"]),
+        "Book Link": markdown_links(df["Book Link"], home),
+    })
 
-bookspermonth.update_traces(
-    hovertemplate='%{x|%B %Y}<br>Books Read: %{y}<extra></extra>'  # Format x as Month Year and customize tooltip
-)
 
+def memory_report(df):
+    # Compare against the old all-object layout: text columns, float years and string dates
+    loose = df.astype({column: object for column, dtype in INGEST_SCHEMA.items() if dtype != "Int16"})
+    loose = loose.astype({"Start Year": "float64", "End Year": "float64"})
+    loose["Start Date"] = format_dates(df["Start Date"]).astype(object)
+    loose["End Date"] = format_dates(df["End Date"]).astype(object)
 
-"""
-==================================================
-2. DASH APPLICATION FEATURES
-==================================================
-"""
+    before = loose.memory_usage(deep=True, index=False)
+    after = df.memory_usage(deep=True, index=False)
+    rows = max(len(df), 1)
 
-app = Dash(suppress_callback_exceptions=True)
+    print(f"{'Column':<32}{'Before':>12}{'After':>12}")
+    for column in list(INGEST_SCHEMA) + ["Start Date", "End Date"]:
+        print(f"{column:<32}{before[column]:>12,}{after[column]:>12,}")
+    print(f"{'Whole frame':<32}{before.sum():>12,}{after.sum():>12,}")
+    print(f"{'Per row':<32}{before.sum() / rows:>12,.0f}{after.sum() / rows:>12,.0f}")
 
+    # The bitmap index factorizes every filter column, which is cheap on categoricals
+    for name, frame in (("object columns", loose), ("compact columns", df)):
+        started = time.perf_counter()
+        BitmapIndex(frame)
+        print(f"Bitmap index build over {name}: {(time.perf_counter() - started) * 1000:.1f} ms")
 
-app.layout = html.Div([
-    dcc.Location(id="url", refresh=False),  # Tracks URL changes
-    html.Div(id="page-content"),  # Placeholder for different pages (content changes here)
-])
 
 """
-==================================================
-3. DASH CALLBACKS
-==================================================
+--------------------------------------------------
+Columnar cache of the preprocessed book log
+--------------------------------------------------
+The cache is an uncompressed Feather (Arrow IPC) file next to the workbook,
+stamped with the workbook's mtime and size. A warm start memory-maps it and
+never touches openpyxl. The Arrow backed text columns keep pointing into the
+mapped file, only the numeric, date and categorical columns are converted
+into process memory. The search index, the slowest part of a snapshot to
+build, is saved beside it as .npy arrays under the same stamp and mapped
+back the same way.
 """
 
-# Callback to display the correct page based on the URL
-@app.callback(
-    Output("page-content", "children"),
-    Input("url", "pathname")
-)
-def display_page(pathname):
-    if pathname.startswith("/book/"):
-        book_name = pathname.split("/book/")[1].replace("_", " ")
-        book_data = df[df["Book"] == book_name]
+def cache_path(log_path):
+    folder, name = os.path.split(log_path)
+    return os.path.join(folder, ".cache", os.path.splitext(name)[0] + ".feather")
 
-        if book_data.empty:
-            return html.H1("Book Not Found")
 
-        book_info = book_data.iloc[0]
-        
-        return html.Div([
-            html.H1(book_info["Book"], style={"textAlign": "center"}),
-            html.Hr(),
-            html.H3(f"Author: {book_info['Author']}"),
-            html.H3(f"Status: {book_info['Status']}"),
-            html.H3(f"Recommendation: {book_info['Rec?']}"),
-            html.H3(f"Recommended By: {book_info['Recommended By']}"),
-            html.H3(f"Start Date: {book_info['Start Date']}"),
-            html.H3(f"End Date: {book_info['End Date']}"),
-            html.P(f"Summary: {book_info['Summary']}"),
-            html.P(f"Core Themes: {book_info['Core Themes']}"),
-            html.P(f"Review: {book_info['Review']}"),
-            html.P(f"What I Gained from Reading: {book_info['What I gained from reading']}"),
-            html.P(f"Story Behind Finding the Book: {book_info['Story behind finding the book']}"),
-            html.H3(f"Genre: {book_info['Genre']}"),
-            html.H3(f"Personal Collection: {book_info['Personal Collection?']}"),
-            html.H3(f"Series/Standalone: {book_info['Series/Standalone?']}"),
-            html.H3(f"Page Count: {book_info['Page Ct.']}"),
-            html.A("Back to Home", href="/"),
-        ])
+def workbook_key(log_path):
+    stat = os.stat(log_path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "version": CACHE_VERSION}
 
-    else:
-        return html.Div([
-    html.H1("Local Book Tracking Analytics Dashboard", style={"textAlign": "center", "fontFamily": "Arial, sans-serif"}),  
-    html.Hr(),  
 
-# Book Status Label and Dropdown
-    html.Div([
-        html.Label("Book Status:", style={"fontFamily": "Arial, sans-serif", "fontWeight": "bold", "fontSize": "16px", "width": "150px"}),
-        dcc.Dropdown(
-            ["Complete", "Reading", "To Be Read"], 
-            ["Complete"], 
-            multi=True, 
-            id="DropdownBookStatus", 
-            style={"width": "75%", "fontFamily": "Arial, sans-serif"}
-        )
-    ], style={"width": "75%", "margin": "auto", "display": "flex", "alignItems": "center", "gap": "10px"}),
-
-    # Recommendation Label and Dropdown
-    html.Div([
-        html.Label("Recommendation:", style={"fontSize": "16px", "fontFamily": "Arial, sans-serif", "fontWeight": "bold", "width": "150px"}),
-        dcc.Dropdown(
-            id="rec-dropdown",
-            options=[
-                {"label": "Yes", "value": "Yes"},
-                {"label": "No", "value": "No"},
-            ],
-            value=["Yes"],  # Default to 'Yes'
-            multi=True,  # Allow multiple selection
-            style={"width": "75%", "fontFamily": "Arial, sans-serif"}
-        ),
-    ], style={"width": "75%", "margin": "auto", "display": "flex", "alignItems": "center", "gap": "10px"}),
-
-    # Year Label
-    html.Div([
-        html.Label("Year:", style={"fontSize": "16px", "fontFamily": "Arial, sans-serif", "fontWeight": "bold", "width": "150px"}),
-        dcc.Dropdown(
-            id="year_dropdown",
-            options= year_options,
-            multi=True,
-            style={"width": "75%", "fontFamily": "Arial, sans-serif"}
-        ),
-    ], style={"width": "75%", "margin": "auto", "display": "flex", "alignItems": "center", "gap": "10px"}),
+def read_cache(log_path):
+    path = cache_path(log_path)
+    if pa is None or not os.path.exists(path):
+        return None
 
-    # Month Label
+    try:
+        table = feather.read_table(path, memory_map=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
 
-        html.Div([
-        html.Label("Month:", style={"fontSize": "16px", "fontFamily": "Arial, sans-serif", "fontWeight": "bold", "width": "150px"}),
-        dcc.Dropdown(
-            id="month_dropdown",
-            options= month_options,
-            multi=True,
-            style={"width": "75%", "fontFamily": "Arial, sans-serif"}
-        ),
-    ], style={"width": "75%", "margin": "auto", "display": "flex", "alignItems": "center", "gap": "10px"}),
-
-
-    # # Genre Dropdown
-    # html.Div([
-    #     html.Label("Genre:", style={"fontFamily": "Arial, sans-serif", "fontWeight": "bold", "fontSize": "16px", "width": "150px"}),
-    #     dcc.Dropdown(options = genre_options, 
-    #         multi=True, 
-    #         id="DropdownBookStatus", 
-    #         style={"width": "75%", "fontFamily": "Arial, sans-serif"}
-    #     )
-    # ], style={"width": "75%", "margin": "auto", "display": "flex", "alignItems": "center", "gap": "10px"}),
-    html.Hr(),
+    metadata = table.schema.metadata or {}
+    if json.loads(metadata.get(b"book_log_key", b"null")) != workbook_key(log_path):
+        return None  # Workbook changed since the cache was written
 
-    # Table
-    dash_table.DataTable(
-                data=df.assign(**{"Book Link": df["Book Link"].apply(lambda x: f"[More Info]({x})")}).to_dict("records"),                columns=[
-                    {"name": "Status", "id": "Status"},
-                    {"name": "Book", "id": "Book"},
-                    {"name": "Author", "id": "Author"},
-                    {"name": "Rating", "id": "Rating"},
-                    {"name": "Recommended By", "id": "Recommended By"},
-                    {"name": "Start Date", "id": "Start Date"},
-                    {"name": "End Date", "id": "End Date"},
-                    {"name": "More Info", "id": "Book Link", "presentation": "markdown"},
-                ],
-        id="MainBookTable",
-        style_table={"width": "80%", "margin": "auto"},  
-        style_data={"fontFamily": "Arial, sans-serif", "fontSize": "14px", "fontWeight": "bold", "textAlign": "center"},
-        style_header={"fontFamily": "Arial, sans-serif", "fontSize": "22px", "fontWeight": "bold", "backgroundColor": "#f4f4f4", "textAlign": "center", "padding": "10px"},
-        style_data_conditional=[
-            {"if": {"column_id": "Status", "filter_query": '{Status} = "Complete"'}, "color": "green", "fontWeight": "bold", "fontStyle": "italic"},
-            {"if": {"column_id": "Status", "filter_query": '{Status} = "To Be Read"'}, "color": "#8B0000", "fontWeight": "bold", "fontStyle": "italic"},
-            {"if": {"column_id": "Status", "filter_query": '{Status} = "Reading"'}, "color": "orange", "fontWeight": "bold", "fontStyle": "italic"}
-        ]
-    ),   
-    html.Hr(),
+    return table.to_pandas(split_blocks=True)
 
-    dcc.Graph(id="ratings_histogram"),
-    html.Hr(),
-    dcc.Graph(figure = bookspermonth)
 
+def write_cache(log_path, df):
+    if pa is None:
+        return
 
-  
-])
+    path = cache_path(log_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
 
-@app.callback(
-    Output("MainBookTable", "data"),
-    [
-        Input("DropdownBookStatus", "value"),
-        Input("rec-dropdown", "value"),
-        Input("year_dropdown", "value"),
-        Input("month_dropdown", "value")
-    ]
-)
-def update_table(status_values, rec_values, selected_years, selected_months,):
-    # Filter by Status and Recommendation
-    if not rec_values:  
-        filtered_df = df[df["Status"].isin(status_values)]
-    else:
-        filtered_df = df[(df["Status"].isin(status_values)) & (df["Rec?"].isin(rec_values))]
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as error:
+        print(f"Skipping book log cache: {error}")
+        return
 
-    # Filter by Year (Optional)
-    if selected_years:
-        filtered_df = filtered_df.loc[
-            (filtered_df["Start Year"].isin(selected_years)) | 
-            (filtered_df["End Year"].isin(selected_years))
-        ]
+    metadata = dict(table.schema.metadata or {})
+    metadata[b"book_log_key"] = json.dumps(workbook_key(log_path)).encode()
+    table = table.replace_schema_metadata(metadata)
 
-    # Filter by Month (Only if Years are Selected)
-    if selected_months:
-        if selected_years:  # Ensure that year filtering is applied
-            filtered_df = filtered_df.loc[
-                ((filtered_df["Start Year"].isin(selected_years)) & (filtered_df["Start Month"].isin(selected_months))) | 
-                ((filtered_df["End Year"].isin(selected_years)) & (filtered_df["End Month"].isin(selected_months)))
-            ]
-        else:  # If no year selected, just filter by month alone
-            filtered_df = filtered_df.loc[
-                (filtered_df["Start Month"].isin(selected_months)) | 
-                (filtered_df["End Month"].isin(selected_months))
-            ]
+    # Write to a temporary file first so a crash never leaves a half written cache behind
+    feather.write_feather(table, path + ".tmp", compression="uncompressed")
+    try:
+        os.replace(path + ".tmp", path)
+    except OSError as error:  # Windows will not replace a file the running snapshot still has mapped
+        print(f"Skipping book log cache: {error}")
+        os.remove(path + ".tmp")
 
-    # # Filter by Genre (Handle NaN Values)
-    # if selected_genres:
-    #     filtered_df = filtered_df.dropna(subset=["Genre"])  # Drop NaNs before applying filter
-    #     filtered_df = filtered_df[
-    #         filtered_df["Genre"].apply(lambda x: any(genre in x.split(", ") for genre in selected_genres))
-    #     ]
 
-    # Format the Book Link as Markdown
-    filtered_df["Book Link"] = filtered_df["Book Link"].apply(lambda x: f"[More Info]({x})")
+def load_book_log(log_path, rebuild=False):
+    df = None if rebuild else read_cache(log_path)
+    if df is None:
+        df = preprocess(BookLogReader.read_book_log(log_path))  # Streams the sheet, see BookLogReader.py
+        write_cache(log_path, df)
+    return df
 
-    return filtered_df.to_dict("records")
 
-# Update visualization based on recommendation filter
-@callback(
-    Output("ratings_histogram", "figure"),
-    Input("rec-dropdown", "value"),
-    Input("year_dropdown", "value"),  # Year filter
-    Input("month_dropdown", "value")  # Month filter
-)
-def update_vis(rec_values, year_values, month_values):
-    if "All" in rec_values or not rec_values:  
-        dfvis1 = df
-    else:
-        # Filter based on selected values for 'Rec?'
-        dfvis1 = df[df["Rec?"].isin(rec_values)]
+def search_cache_path(log_path):
+    return os.path.splitext(cache_path(log_path))[0] + ".search"
 
-    if not year_values or "All" in year_values:  # Check for None or empty
-        dfvis1 = dfvis1  # No filtering on Year
-    else:
-        # Filter based on both Start Year and End Year
-        dfvis1 = dfvis1[dfvis1["Start Year"].isin(year_values) | dfvis1["End Year"].isin(year_values)]
 
-    if not month_values or "All" in month_values:  # Check for None or empty
-        dfvis1 = dfvis1  # No filtering on Year
-    else:
-        # Filter based on both Start Year and End Year
-        dfvis1 = dfvis1[dfvis1["Start Month"].isin(month_values) | dfvis1["End Month"].isin(month_values)]
+def read_search_cache(log_path, key):
+    folder = search_cache_path(log_path)
+    try:
+        with open(os.path.join(folder, "state.json")) as file:
+            saved = json.load(file)
+        if saved["book_log_key"] != dict(key, search=SEARCH_CACHE_VERSION):
+            return None  # Built from another version of the workbook
+        return SearchIndex.from_state(load_state(saved["state"], folder))
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_search_cache(log_path, key, index):
+    folder = search_cache_path(log_path)
+    staging = folder + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    state = dump_state(index.to_state(), staging, [])
+    with open(os.path.join(staging, "state.json"), "w") as file:
+        json.dump({"book_log_key": dict(key, search=SEARCH_CACHE_VERSION), "state": state}, file)
+
+    # The running snapshot may still have the old arrays mapped, so the folder is swapped rather than overwritten
+    shutil.rmtree(folder, ignore_errors=True)
+    try:
+        os.rename(staging, folder)
+    except OSError as error:  # Windows keeps mapped files, and so the old folder, around
+        print(f"Skipping search index cache: {error}")
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def load_search_index(log_path, key, df, rebuild=False):
+    index = None if rebuild else read_search_cache(log_path, key)
+    if index is None:
+        index = SearchIndex(df)
+        write_search_cache(log_path, key, index)
+    return index
+
+
+def load_log_snapshot(log_path, version, key, previous=None, tenant=None, rebuild=False):
+    # build_snapshot() for a workbook, reusing the cached frame and search index when they match key
+    df = load_book_log(log_path, rebuild)
+    search_index = load_search_index(log_path, key, df, rebuild)
+    return build_snapshot(df, version, key, previous, tenant, search_index)
 
 
-    # Categorize the ratings into buckets (you can adjust ranges as needed)
-    rating_bins = pd.cut(dfvis1['Rating'], bins=[0, 5, 7, 10], labels=["Low", "Medium", "High"])
+month_options = [{"label": month, "value": month} for month in MONTHS]
 
-    # Add a new column for the rating categories
-    dfvis1['Rating Category'] = rating_bins
 
-    # Create histogram
-    vis = px.histogram(
-        dfvis1, 
-        x="Rating",  # Show rating distribution
-        nbins=20,  # Adjust number of bins as necessary
-        color="Rating Category",  # Color based on the rating category
-        color_discrete_map={"Low": "#8B0000", "Medium": "orange", "High": "green"},  # Set color map
-        title="Ratings Distribution"
+def make_bookspermonth(values_list):
+    import plotly.express as px  # Only needed once a snapshot is built, keeps import and startup quick
+
+    bookspermonth = px.line(values_list, x='Date', y='Books Read', title='Books Read Per Month', markers=True)
+
+    bookspermonth.update_layout(
+        title={
+            'text': 'Books Read Per Month',  # Title text
+            'font': {
+                'family': 'Arial, sans-serif',  # Font type
+                'size': 24,  # Font size
+                'color': 'black',  # Font color
+                'weight': 'bold'  # Font weight
+            },
+            'x': 0.5,  # Center the title horizontally
+            'xanchor': 'center'  # Align the title to the center
+        },
+        yaxis=dict(
+            showticklabels=True,  # Show labels on the y-axis
+            showgrid=False,  # Remove grid lines
+            zeroline=False,  # Hide the zero line
+            title="Books Read"  # Set y-axis title
+        ),
+        xaxis=dict(
+            showgrid=True,  # Keep grid on the x-axis
+            zeroline=True,  # Show the zero line
+            linecolor="black"  # Change x-axis line color to black
+        ),
+        plot_bgcolor='white',  # Set the background color of the plot area
+        paper_bgcolor='white',  # Set the background color of the entire figure
+        hoverlabel=dict(
+            bgcolor="rgba(255,255,255,0.7)",  # Slightly transparent background for hover
+            font_size=14,  # Font size for hover label
+            font_family="Arial, sans-serif",  # Font for hover label
+            font_color="black"  # Hover label text color
+        ),
+        margin=dict(t=40, b=30, l=40, r=40),  # Adjust margins for compactness
+        hovermode="closest",  # More responsive hover
+        legend=dict(
+            visible=False  # Hide the legend
+        )
     )
+
+    # Update the line thickness
+    bookspermonth.update_traces(line=dict(width=7, color = 'navy'), marker=dict(size=15, symbol = 'circle'))  # Line thickness and marker size
+
+    bookspermonth.update_traces(
+        hovertemplate='%{x|%B %Y}<br>Books Read: %{y}<extra></extra>'  # Format x as Month Year and customize tooltip
+    )
+    return bookspermonth
+
+
+def style_ratings_histogram(vis):
     # Update layout for custom title styling, axis removal, and no legend
     vis.update_layout(
         title={
@@ -385,7 +445,2180 @@ def update_vis(rec_values, year_values, month_values):
     )
     return vis
 
-if __name__ == "__main__":
-    app.run(debug=True)
+
+"""
+--------------------------------------------------
+Bitmap index for the dropdown filters
+--------------------------------------------------
+For every filterable column we keep one boolean bitmap per distinct value,
+built once per snapshot. A filter is then an OR of the bitmaps for the
+selected values, filters combine with AND, and the frame is gathered once.
+"""
+
+FILTER_COLUMNS = ["Status", "Rec?", "Start Year", "End Year", "Start Month", "End Month"]
+
+
+class BitmapIndex:
+    def __init__(self, df, columns=FILTER_COLUMNS):
+        self.size = len(df)
+        self.bitmaps = {}
+        self.matrices = {}
+        for column in columns:
+            self.add_column(column, df[column])
+
+    def add_column(self, column, values):
+        # One (book, value) pair per book with a value, missing values get no bitmap
+        self.add_multi_value_column(column, values.reset_index(drop=True))
+
+    def add_multi_value_column(self, column, exploded):
+        # exploded holds one entry per (book, value) pair, indexed by the book's row position
+        codes, uniques = pd.factorize(exploded)
+        present = codes >= 0
+
+        # A value x book membership matrix filled with one scatter, each row is that value's bitmap
+        matrix = np.zeros((len(uniques), self.size), dtype=bool)
+        matrix[codes[present], exploded.index.to_numpy()[present]] = True
+        self.add_matrix(column, list(uniques), matrix)
+
+    def add_matrix(self, column, values, matrix):
+        self.matrices[column] = (values, matrix)
+        self.bitmaps[column] = {value: matrix[code] for code, value in enumerate(values)}
+
+    def to_state(self):
+        columns = {column: {"values": values, "matrix": matrix} for column, (values, matrix) in self.matrices.items()}
+        return {"size": self.size, "columns": columns}
+
+    @classmethod
+    def from_state(cls, state):
+        index = cls.__new__(cls)
+        index.size = state["size"]
+        index.bitmaps = {}
+        index.matrices = {}
+        for column, entry in state["columns"].items():
+            index.add_matrix(column, entry["values"], entry["matrix"])
+        return index
+
+    # start limits a query to the rows from that position on, e.g. rows appended by a reload
+    def any_of(self, column, values, start=0):
+        bitmap = np.zeros(self.size - start, dtype=bool)
+        for value in values:
+            if value in self.bitmaps[column]:  # A value no row has, e.g. from a stale dropdown, matches nothing
+                bitmap |= self.bitmaps[column][value][start:]
+        return bitmap
+
+    def all_of(self, column, values, start=0):
+        bitmap = self.everything(start)
+        for value in values:
+            if value not in self.bitmaps[column]:
+                return np.zeros(self.size - start, dtype=bool)
+            bitmap &= self.bitmaps[column][value][start:]
+        return bitmap
+
+    def everything(self, start=0):
+        return np.ones(self.size - start, dtype=bool)
+
+
+"""
+--------------------------------------------------
+Rating cube for the ratings histogram
+--------------------------------------------------
+Book counts pre-aggregated over Status x Rec? x Start/End Year x
+Start/End Month x rating bin. Only the combinations that occur are stored,
+and the cube rows get their own BitmapIndex, so the histogram filters a few
+hundred cube rows and sums their counts per bin instead of touching books.
+"""
+
+RATING_BIN_WIDTH = 0.5
+RATING_BINS = 20  # Half point bins from 0 to 10
+RATING_COLORS = {"Low": "#8B0000", "Medium": "orange", "High": "green"}
+
+
+def rating_bins(ratings):
+    # Right closed bins like pd.cut, so a 5.0 is still Low and a 7.0 still Medium. Unrated books get -1
+    bins = np.ceil(ratings.to_numpy(dtype=float) / RATING_BIN_WIDTH) - 1
+    bins = np.clip(bins, 0, RATING_BINS - 1)
+    return np.where(np.isnan(bins), -1, bins).astype(np.int64)
+
+
+def rating_category(upper_edge):
+    if upper_edge <= 5:
+        return "Low"
+    if upper_edge <= 7:
+        return "Medium"
+    return "High"
+
+
+class RatingCube:
+    def __init__(self, df, columns=FILTER_COLUMNS):
+        bins = rating_bins(df["Rating"])
+        rated = df.loc[bins >= 0, columns].assign(**{"Rating Bin": bins[bins >= 0]})
+
+        cells = rated.groupby(columns + ["Rating Bin"], dropna=False, sort=False).size().reset_index(name="Books")
+        self.bins = cells["Rating Bin"].to_numpy()
+        self.books = cells["Books"].to_numpy()
+        self.index = BitmapIndex(cells, columns)
+
+        # Per book bins for filters that are not cube dimensions, like the multi-label genres
+        self.book_bins = bins
+
+    def to_state(self):
+        return {"bins": self.bins, "books": self.books, "index": self.index.to_state(), "book_bins": self.book_bins}
+
+    @classmethod
+    def from_state(cls, state):
+        cube = cls.__new__(cls)
+        cube.bins = state["bins"]
+        cube.books = state["books"]
+        cube.index = BitmapIndex.from_state(state["index"])
+        cube.book_bins = state["book_bins"]
+        return cube
+
+    def counts(self, mask):
+        return np.bincount(self.bins[mask], weights=self.books[mask], minlength=RATING_BINS).astype(np.int64)
+
+    def book_counts(self, mask):
+        return np.bincount(self.book_bins[mask & (self.book_bins >= 0)], minlength=RATING_BINS)
+
+
+"""
+--------------------------------------------------
+Precomputed sort orders for the book table
+--------------------------------------------------
+The table is paged and sorted on the server. Each sortable column gets one
+stable argsort per snapshot (missing values last), so sorting a filtered
+selection is just keeping the sorted positions whose bitmap bit is set.
+"""
+
+SORT_COLUMNS = ["Status", "Book", "Author", "Rating", "Recommended By", "Start Date", "End Date"]
+
+
+def build_sort_orders(df):
+    sort_orders = {}
+    for column in SORT_COLUMNS:
+        values = df[column]
+        order = values.sort_values(kind="stable", na_position="last").index.to_numpy()
+        sort_orders[column] = (order, values.notna().sum())
+    return sort_orders
+
+
+def sortable(sort_by):
+    # Only columns with a sort order sort, a click on the "More Info" links leaves the table as it was
+    return [entry for entry in sort_by or [] if entry["column_id"] in SORT_COLUMNS]
+
+
+def sorted_rows(sort_orders, mask, sort_by):
+    if not sort_by:
+        return np.flatnonzero(mask)
+
+    order, valid = sort_orders[sort_by[0]["column_id"]]
+    if sort_by[0]["direction"] == "desc":
+        order = np.concatenate([order[:valid][::-1], order[valid:]])  # Keep missing values at the bottom
+    return order[mask[order]]
+
+
+"""
+--------------------------------------------------
+Book page lookup
+--------------------------------------------------
+/book/<slug> finds its row by binary search over the sorted slugs. They are
+kept as one bytes array rather than a dict of Python strings, so a shared
+snapshot maps the lookup read-only like the other indexes.
+"""
+
+class SlugIndex:
+    def __init__(self, links):
+        slugs = links.str.slice(len("/book/")).to_numpy(dtype=object).astype("S")  # make_slugs() only writes ASCII
+        self.order = np.argsort(slugs, kind="stable")
+        self.slugs = slugs[self.order]
+
+    def to_state(self):
+        return {"order": self.order, "slugs": self.slugs}
+
+    @classmethod
+    def from_state(cls, state):
+        index = cls.__new__(cls)
+        index.order = state["order"]
+        index.slugs = state["slugs"]
+        return index
+
+    def get(self, slug):
+        try:
+            key = slug.encode("ascii")
+        except UnicodeEncodeError:
+            return None
+        if len(key) > self.slugs.dtype.itemsize:
+            return None  # searchsorted would cut it down to the array's width
+        position = np.searchsorted(self.slugs, key)
+        if position < len(self.slugs) and self.slugs[position] == key:
+            return int(self.order[position])
+        return None
+
+
+"""
+--------------------------------------------------
+Date range overlap
+--------------------------------------------------
+"What was I reading in this period" is an interval overlap: a book matches
+when it started on or before the last day and ended on or after the first.
+Start and end days are kept sorted with their row positions, so each bound
+is a binary search, and only the smaller candidate set is checked against
+the other bound. Books still being read have no end date and overlap every
+later period; books without any dates never match.
+"""
+
+OPEN_END = np.iinfo(np.int64).max
+
+
+def day_numbers(dates):
+    days = dates.to_numpy(dtype="datetime64[D]")
+    return np.where(np.isnat(days), OPEN_END, days.astype(np.int64))
+
+
+def picker_day(value):
+    # DatePickerRange sends ISO dates, None leaves that side of the range open
+    if not value:
+        return None
+    return int(pd.Timestamp(value).to_datetime64().astype("datetime64[D]").astype(np.int64))
+
+
+class DateIntervalIndex:
+    def __init__(self, df):
+        self.size = len(df)
+        self.ends = day_numbers(df["End Date"])
+        self.starts = day_numbers(df["Start Date"])
+        self.starts = np.where(self.starts == OPEN_END, self.ends, self.starts)  # A finish date alone is a one day read
+
+        self.start_order = np.argsort(self.starts, kind="stable")
+        self.sorted_starts = self.starts[self.start_order]
+        self.end_order = np.argsort(self.ends, kind="stable")
+        self.sorted_ends = self.ends[self.end_order]
+
+    def overlapping(self, first_day=None, last_day=None):
+        first = np.iinfo(np.int64).min if first_day is None else first_day
+        last = OPEN_END - 1 if last_day is None else last_day
+
+        started = np.searchsorted(self.sorted_starts, last, side="right")  # start_order[:started] began by the last day
+        not_ended = np.searchsorted(self.sorted_ends, first, side="left")  # end_order[not_ended:] ended on or after the first
+
+        mask = np.zeros(self.size, dtype=bool)
+        if started <= self.size - not_ended:
+            candidates = self.start_order[:started]
+            mask[candidates[self.ends[candidates] >= first]] = True
+        else:
+            candidates = self.end_order[not_ended:]
+            mask[candidates[self.starts[candidates] <= last]] = True
+        return mask
+
+    def bounds(self):
+        # First start and last finish as ISO dates, for the date picker
+        dated = np.searchsorted(self.sorted_starts, OPEN_END)
+        finished = np.searchsorted(self.sorted_ends, OPEN_END)
+        if not dated:
+            return None, None
+        first = self.sorted_starts[0]
+        last = max(self.sorted_ends[finished - 1] if finished else first, self.sorted_starts[dated - 1])
+        return str(np.datetime64(int(first), "D")), str(np.datetime64(int(last), "D"))
+
+    def to_state(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_state(cls, state):
+        index = cls.__new__(cls)
+        vars(index).update(state)
+        return index
+
+
+"""
+--------------------------------------------------
+Books read per month
+--------------------------------------------------
+Each book's finish month is kept as a month number (months since 1970), so
+a filtered series is one bincount from the first to the last month with the
+empty months left at zero. Counts are cached per filter across reloads, and
+when a reload only appended rows the cached counts are topped up from the
+new rows instead of counted again.
+"""
+
+# Columns the month series filters on, a reload that keeps them for the old rows only appended
+MONTHLY_FILTER_COLUMNS = ["Status", "Rec?", "Genre"]
+
+
+def month_numbers(dates):
+    months = dates.to_numpy(dtype="datetime64[M]")
+    return np.where(np.isnat(months), OPEN_END, months.astype(np.int64))
+
+
+def count_months(months):
+    # (first month, books per month from there on), gaps count zero
+    months = months[months != OPEN_END]
+    if not len(months):
+        return 0, np.zeros(0, dtype=np.int64)
+    first = int(months.min())
+    return first, np.bincount(months - first)
+
+
+def add_month_counts(left, right):
+    if not len(right[1]):
+        return left
+    if not len(left[1]):
+        return right
+
+    first = min(left[0], right[0])
+    last = max(left[0] + len(left[1]), right[0] + len(right[1]))
+    counts = np.zeros(last - first, dtype=np.int64)
+    for month, part in (left, right):
+        counts[month - first:month - first + len(part)] += part
+    return first, counts
+
+
+def monthly_series(first, counts):
+    months = np.arange(first, first + len(counts)).astype("datetime64[M]")
+    return pd.DataFrame({"Date": pd.to_datetime(months), "Books Read": counts})
+
+
+def same_values(old, new):
+    if isinstance(old.dtype, pd.CategoricalDtype) and isinstance(new.dtype, pd.CategoricalDtype) \
+            and old.cat.categories.equals(new.cat.categories):
+        return np.array_equal(old.cat.codes.to_numpy(), new.cat.codes.to_numpy())
+    return old.astype(str).reset_index(drop=True).equals(new.astype(str).reset_index(drop=True))
+
+
+def appended_to(previous, df, end_months):
+    # (version, rows) of the previous snapshot when the new log only added rows after its rows
+    if previous is None or len(df) < len(previous.df):
+        return None
+    rows = len(previous.df)
+    if not np.array_equal(end_months[:rows], previous.end_months):
+        return None
+    for column in MONTHLY_FILTER_COLUMNS:
+        if not same_values(previous.df[column], df[column].iloc[:rows]):
+            return None
+    return (previous.version, rows)
+
+
+"""
+--------------------------------------------------
+Full-text search
+--------------------------------------------------
+An inverted index over the title, author and free-text columns, tokenized
+once per snapshot. Postings are stored CSR style (one array of documents
+and term frequencies, sliced per term) and the vocabulary is sorted so a
+prefix is a binary search. Every query word must match, either exactly or
+as a prefix, and the matches are ranked with BM25.
+"""
+
+SEARCH_COLUMNS = [
+    "Book", "Author", "Genre", "Summary", "Core Themes", "Review",
+    "What I gained from reading", "Story behind finding the book",
+]
+
+TOKEN_PATTERN = r"[a-z0-9]+"
+
+# A one or two letter prefix can match thousands of words, only the most common ones are scored
+MAX_PREFIX_TERMS = 64
+
+
+def query_words(query):
+    return re.findall(TOKEN_PATTERN, ascii_lower(pd.Series([query])).iat[0])
+
+
+def text_buffer(text):
+    # The characters of every row back to back and where each row starts, read from the Arrow buffers without a copy
+    array = pa.array(text, type=pa.large_string())
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    _, offsets, data = array.buffers()
+    offsets = np.frombuffer(offsets, dtype=np.int64)[array.offset:array.offset + len(array) + 1]
+    chars = np.frombuffer(data, dtype=np.uint8) if data is not None else np.zeros(0, dtype=np.uint8)
+    return chars[offsets[0]:offsets[-1]], offsets - offsets[0]
+
+
+def tokenize(text):
+    # The row position and term code of every word, and the sorted vocabulary the codes point into
+    if pa is None:
+        tokens = text.str.findall(TOKEN_PATTERN).explode().dropna()
+        term_codes, vocab = pd.factorize(tokens.to_numpy(), sort=True)
+        return tokens.index.to_numpy(), term_codes, np.asarray(vocab, dtype=str)
+
+    # The text is plain ASCII by now, so words are runs of [a-z0-9] bytes. Finding them with array
+    # operations over the whole buffer avoids a Python string per word
+    chars, offsets = text_buffer(text)
+    word = ((chars >= ord("a")) & (chars <= ord("z"))) | ((chars >= ord("0")) & (chars <= ord("9")))
+    after_word = np.zeros_like(word)
+    after_word[1:] = word[:-1]
+    before_word = np.zeros_like(word)
+    before_word[:-1] = word[1:]
+    row_starts = offsets[1:-1][offsets[1:-1] < len(chars)]
+    after_word[row_starts] = False  # A word never runs on into the next row
+    before_word[row_starts - 1] = False
+    starts = np.flatnonzero(word & ~after_word)
+    ends = np.flatnonzero(word & ~before_word) + 1
+    documents = np.repeat(np.arange(len(offsets) - 1), np.diff(np.searchsorted(starts, offsets)))
+
+    # The word characters alone are the words back to back, so they make an Arrow string array to encode
+    token_offsets = np.zeros(len(starts) + 1, dtype=np.int64)
+    np.cumsum(ends - starts, out=token_offsets[1:])
+    tokens = pa.LargeStringArray.from_buffers(len(starts), pa.py_buffer(token_offsets), pa.py_buffer(chars[word]))
+    encoded = tokens.dictionary_encode()
+    vocab = encoded.dictionary.to_numpy(zero_copy_only=False).astype(str)
+    order = np.argsort(vocab, kind="stable")
+    ranks = np.empty_like(order)
+    ranks[order] = np.arange(len(order))
+    return documents, ranks[encoded.indices.to_numpy()], vocab[order]
+
+
+class SearchIndex:
+    def __init__(self, df, columns=SEARCH_COLUMNS, k1=1.2, b=0.75):
+        self.size = len(df)
+        self.k1 = k1
+        self.b = b
+
+        text = ascii_lower(df[columns[0]])
+        for column in columns[1:]:
+            text = text + " " + ascii_lower(df[column])
+        documents, term_codes, self.vocab = tokenize(text)
+
+        self.doc_lengths = np.bincount(documents, minlength=self.size)
+        self.average_length = max(self.doc_lengths.mean(), 1) if self.size else 1
+
+        # One entry per (term, document) pair with its count, sorted by term and then document
+        width = max(self.size, 1)
+        pairs, self.frequencies = np.unique(term_codes.astype(np.int64) * width + documents, return_counts=True)
+        self.indptr = np.searchsorted(pairs // width, np.arange(len(self.vocab) + 1))
+        self.postings = pairs % width
+
+    def to_state(self):
+        return dict(vars(self))  # Scalars and arrays only
+
+    @classmethod
+    def from_state(cls, state):
+        index = cls.__new__(cls)
+        vars(index).update(state)
+        return index
+
+    def matching_terms(self, word):
+        lo = np.searchsorted(self.vocab, word)
+        hi = np.searchsorted(self.vocab, word + "~")  # "~" sorts after every token character
+        terms = np.arange(lo, hi)
+
+        if len(terms) > MAX_PREFIX_TERMS:
+            # The word as typed always counts, however rare, only its longer completions are capped
+            exact = terms[:1] if self.vocab[lo] == word else terms[:0]
+            longer = terms[len(exact):]
+            document_counts = self.indptr[longer + 1] - self.indptr[longer]
+            longer = longer[np.argsort(-document_counts, kind="stable")[:MAX_PREFIX_TERMS - len(exact)]]
+            terms = np.concatenate([exact, longer])
+        return terms
+
+    def search(self, query):
+        words = query_words(query)
+        scores = np.zeros(self.size)
+        matches = np.ones(self.size, dtype=bool)
+
+        for word in words:
+            word_matches = np.zeros(self.size, dtype=bool)
+            for term in self.matching_terms(word):
+                documents = self.postings[self.indptr[term]:self.indptr[term + 1]]
+                frequencies = self.frequencies[self.indptr[term]:self.indptr[term + 1]]
+
+                idf = np.log(1 + (self.size - len(documents) + 0.5) / (len(documents) + 0.5))
+                length_norm = 1 - self.b + self.b * self.doc_lengths[documents] / self.average_length
+                scores[documents] += idf * frequencies * (self.k1 + 1) / (frequencies + self.k1 * length_norm)
+                word_matches[documents] = True
+            matches &= word_matches
+
+        return matches, scores
+
+
+"""
+--------------------------------------------------
+Bounded LRU cache
+--------------------------------------------------
+"""
+
+class LRUCache:
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl  # Seconds an entry stays valid, None keeps entries until they are evicted
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or (entry[1] is not None and entry[1] < time.monotonic()):
+                self.entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self.lock:
+            self.entries[key] = (value, expires)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class TenantCache:
+    # Snapshots per reader, the least recently used are dropped once their estimated size passes the budget
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # user -> (snapshot, estimated bytes)
+        self.lock = threading.Lock()
+        self.loading = {}  # user -> lock held while that reader's log loads
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, user):
+        with self.lock:
+            entry = self.entries.get(user)
+            if entry is None:
+                return None
+            self.entries.move_to_end(user)
+            self.hits += 1
+            return entry[0]
+
+    def get(self, user, load):
+        snap = self.lookup(user)
+        if snap is not None:
+            return snap
+
+        with self.lock:
+            load_lock = self.loading.setdefault(user, threading.Lock())
+        with load_lock:  # Concurrent first requests for one reader wait for a single load
+            snap = self.lookup(user)
+            if snap is None:
+                with self.lock:
+                    self.misses += 1
+                try:
+                    snap = load(user)
+                    self.put(user, snap)
+                finally:
+                    with self.lock:
+                        self.loading.pop(user, None)
+        return snap
+
+    def put(self, user, snap):
+        size = snapshot_bytes(snap)
+        with self.lock:
+            self.entries[user] = (snap, size)
+            self.entries.move_to_end(user)
+            # The newest reader always stays, even when it alone is over the budget
+            while len(self.entries) > 1 and sum(size for _, size in self.entries.values()) > self.max_bytes:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def total_bytes(self):
+        with self.lock:
+            return sum(size for _, size in self.entries.values())
+
+    def snapshots(self):
+        with self.lock:
+            return {user: snap for user, (snap, _) in self.entries.items()}
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
 
 
+# Rendered book detail pages, keyed by (tenant, snapshot version, slug)
+book_pages = LRUCache(maxsize=256)
+
+# Ratings histograms, keyed by tenant, snapshot version and the normalized filter values
+figures = LRUCache(maxsize=128, ttl=15 * 60)
+
+# Books per month counts, keyed by tenant and the normalized filter values only so they outlive a reload
+month_counts = LRUCache(maxsize=128)
+
+
+"""
+--------------------------------------------------
+Clientside filtering payload
+--------------------------------------------------
+With --clientside the home page ships the filterable columns once in a
+dcc.Store and assets/clientside.js filters, sorts, pages and bins them in
+the browser. Categoricals travel as codes plus their categories, dates as
+day numbers, and each book's genres as a list of genre codes.
+"""
+
+CLIENTSIDE_TEXT_COLUMNS = ["Book", "Author", "Recommended By"]
+
+
+def json_values(values):
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def clientside_payload(df, version, genres, unique_genres, home="/"):
+    epoch = pd.Timestamp("1970-01-01")
+    genre_codes = pd.Series(pd.Categorical(genres, categories=unique_genres).codes, index=genres.index)
+    genre_lists = genre_codes.groupby(level=0).agg(list).reindex(range(len(df)))
+
+    return {
+        "version": version,
+        "size": len(df),
+        "categorical": {
+            column: {"categories": df[column].cat.categories.tolist(), "codes": df[column].cat.codes.tolist()}
+            for column in ["Status", "Rec?", "Start Month", "End Month"]
+        },
+        "years": {column: json_values(df[column]) for column in ["Start Year", "End Year"]},
+        "days": {column: json_values((df[column] - epoch).dt.days.astype("Int64")) for column in ["Start Date", "End Date"]},
+        "text": {column: json_values(df[column]) for column in CLIENTSIDE_TEXT_COLUMNS},
+        "slugs": df["Book Link"].str.slice(len("/book/")).tolist(),
+        "sort_columns": SORT_COLUMNS,
+        "home": home,  # Book links are relative to the reader's home page
+        "rating": json_values(df["Rating"]),
+        "genres": {"categories": unique_genres, "lists": [codes if isinstance(codes, list) else [] for codes in genre_lists]},
+        "months": MONTHS,
+        "rating_bins": {"width": RATING_BIN_WIDTH, "count": RATING_BINS, "colors": RATING_COLORS},
+        "histogram_layout": style_ratings_histogram(go.Figure()).layout.to_plotly_json(),
+        "bookspermonth": make_bookspermonth(monthly_series(0, np.zeros(0, dtype=np.int64))).to_plotly_json(),
+    }
+
+
+"""
+--------------------------------------------------
+Data snapshots and hot reload
+--------------------------------------------------
+Everything derived from the book log lives on one immutable Snapshot. Nothing
+is loaded at import: the first current_snapshot() call (or the warm-up thread
+started by create_app) builds it, and concurrent callers wait for that one
+load. The watcher thread builds new ones off the request path and swaps the
+module global in a single assignment, so a callback that reads the snapshot
+once always sees a consistent version and never waits on a reload.
+"""
+
+@dataclass(frozen=True, eq=False)
+class Snapshot:
+    version: int
+    key: dict
+    df: pd.DataFrame
+    year_options: list
+    unique_genres: list
+    genre_options: list
+    end_months: np.ndarray
+    appended: tuple  # (version, rows) of the snapshot this one only appended rows to, or None
+    index: BitmapIndex
+    sort_orders: dict
+    date_index: DateIntervalIndex
+    slug_index: SlugIndex
+    table_view: pd.DataFrame  # The table's columns formatted for display, links relative to the reader's home
+    search_index: SearchIndex
+    rating_cube: RatingCube
+    clientside: dict
+    tenant: str = None  # The reader this log belongs to, None for the default log
+
+
+def genre_pairs(df):
+    # One entry per (book, genre), indexed by the book's row position
+    return df["Genre"].dropna().str.split(", ").explode()
+
+
+def build_snapshot(df, version, key=None, previous=None, tenant=None, search_index=None):
+    year_options = [{"label": str(int(year)), "value": int(year)} for year in sorted(df["Start Year"].dropna().unique())]
+
+    genres = genre_pairs(df)
+    unique_genres = sorted(set(genres))
+
+    genre_options = [{"label": str(genre), "value": str(genre)} for genre in unique_genres]
+
+    end_months = month_numbers(df["End Date"])
+
+    index = BitmapIndex(df)
+    index.add_multi_value_column("Genre", genres)
+
+    return Snapshot(
+        version=version,
+        key=key,
+        df=df,
+        year_options=year_options,
+        unique_genres=unique_genres,
+        genre_options=genre_options,
+        end_months=end_months,
+        appended=appended_to(previous, df, end_months),
+        index=index,
+        sort_orders=build_sort_orders(df),
+        date_index=DateIntervalIndex(df),
+        slug_index=SlugIndex(df["Book Link"]),
+        table_view=table_view(df, home_path(tenant)),
+        search_index=search_index if search_index is not None else SearchIndex(df),
+        rating_cube=RatingCube(df),
+        clientside=clientside_payload(df, version, genres, unique_genres, home_path(tenant)) if app_config.clientside else None,
+        tenant=tenant,
+    )
+
+
+app_config = Config()  # Replaced by create_app(), read by the loader and the callbacks
+snapshot = None  # Built on first use by current_snapshot()
+snapshot_lock = threading.Lock()
+load_error = None  # Why the last load failed, reported by /healthz
+
+
+def current_snapshot():
+    if snapshot is None:
+        with snapshot_lock:
+            if snapshot is None:  # Another thread may have loaded it while we waited
+                load_snapshot()
+    return snapshot
+
+
+def load_snapshot():
+    global snapshot, load_error
+
+    log_path = app_config.log_path
+    try:
+        if app_config.shared:
+            snapshot = attach_shared_snapshot(shared_folder(log_path))
+        else:
+            key = workbook_key(log_path)
+            snapshot = load_log_snapshot(log_path, 1, key, rebuild=app_config.rebuild_cache)
+        load_error = None
+    except Exception as error:
+        load_error = error
+        raise
+
+
+def warm_snapshot():
+    try:
+        current_database() if app_config.database else current_snapshot()
+    except Exception as error:  # Requests will retry the load and show the error
+        print(f"Could not load {app_config.log_path}: {error}")
+
+
+def reload_snapshot(log_path):
+    global snapshot
+
+    key = workbook_key(log_path)
+    new_snapshot = load_log_snapshot(log_path, snapshot.version + 1, key, previous=snapshot)
+    snapshot = new_snapshot  # Atomic swap, readers keep whichever version they already hold
+    book_pages.clear()
+    figures.clear()
+
+
+def watch_book_log(log_path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            # Nothing to compare against until the first load has finished
+            if snapshot is not None and workbook_key(log_path) != snapshot.key:
+                reload_snapshot(log_path)
+                print(f"Reloaded {log_path} (version {snapshot.version})")
+        except Exception as error:  # Excel may still be writing the file, try again next poll
+            print(f"Could not reload {log_path}: {error}")
+
+
+"""
+--------------------------------------------------
+Shared snapshots for multi-worker serving
+--------------------------------------------------
+With several gunicorn workers, one loader process (--publish) builds each
+snapshot and publishes it as a generation folder: the frame and the
+table's display columns as uncompressed Arrow files and every index array,
+the slug lookup included, as a .npy file. Workers (--shared) memory-map
+them read-only, so the text columns and indexes sit in the page cache once
+however many workers there are. Each worker still converts the numeric,
+date and categorical columns into its own memory, and with --clientside
+builds its own browser payload. CURRENT names the
+latest generation and is replaced atomically, and the workers' watcher
+threads follow it.
+"""
+
+SHARED_GENERATIONS_KEPT = 3  # Older generations are deleted, workers still on one keep their open mappings
+
+# Bump this whenever the published state changes so workers wait for a loader that writes the new layout
+SHARED_FORMAT = 3
+
+
+def shared_folder(log_path):
+    folder, name = os.path.split(log_path)
+    return os.path.join(folder, ".cache", os.path.splitext(name)[0] + ".shared")
+
+
+def dump_state(state, folder, files):
+    # Arrays become .npy files referenced by name, everything else must fit in JSON
+    if isinstance(state, np.ndarray):
+        name = f"{len(files)}.npy"
+        np.save(os.path.join(folder, name), state, allow_pickle=False)
+        files.append(name)
+        return {"npy": name}
+    if isinstance(state, dict):
+        return {key: dump_state(value, folder, files) for key, value in state.items()}
+    if isinstance(state, (list, tuple)):
+        return [dump_state(value, folder, files) for value in state]
+    if isinstance(state, np.generic):
+        return state.item()
+    return state
+
+
+def load_state(state, folder):
+    if isinstance(state, dict):
+        if set(state) == {"npy"}:
+            return np.load(os.path.join(folder, state["npy"]), mmap_mode="r")
+        return {key: load_state(value, folder) for key, value in state.items()}
+    if isinstance(state, list):
+        return [load_state(value, folder) for value in state]
+    return state
+
+
+def read_generation(folder):
+    try:
+        with open(os.path.join(folder, "CURRENT")) as file:
+            current = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return current["generation"] if current.get("format") == SHARED_FORMAT else None
+
+
+def publish_snapshot(folder, snap):
+    if pa is None:
+        raise RuntimeError("Shared snapshots need pyarrow")
+
+    generation = snap.version
+    path = os.path.join(folder, f"g{generation:06d}")
+    os.makedirs(path, exist_ok=True)
+
+    table = pa.Table.from_pandas(snap.df, preserve_index=False)
+    feather.write_feather(table, os.path.join(path, "frame.arrow"), compression="uncompressed")
+    view = pa.Table.from_pandas(snap.table_view[DISPLAY_COLUMNS], preserve_index=False)
+    feather.write_feather(view, os.path.join(path, "table.arrow"), compression="uncompressed")
+
+    state = {
+        "version": snap.version,
+        "key": snap.key,
+        "year_options": snap.year_options,
+        "unique_genres": snap.unique_genres,
+        "genre_options": snap.genre_options,
+        "end_months": snap.end_months,
+        "appended": snap.appended,
+        "index": snap.index.to_state(),
+        "sort_orders": snap.sort_orders,
+        "date_index": snap.date_index.to_state(),
+        "search_index": snap.search_index.to_state(),
+        "rating_cube": snap.rating_cube.to_state(),
+        "slug_index": snap.slug_index.to_state(),
+    }
+    with open(os.path.join(path, "manifest.json"), "w") as file:
+        json.dump(dump_state(state, path, []), file)
+
+    # Bump the generation counter last, a worker never sees a half written generation
+    with open(os.path.join(folder, "CURRENT.tmp"), "w") as file:
+        json.dump({"generation": generation, "format": SHARED_FORMAT}, file)
+    os.replace(os.path.join(folder, "CURRENT.tmp"), os.path.join(folder, "CURRENT"))
+
+    for name in sorted(os.listdir(folder)):
+        if name.startswith("g") and int(name[1:]) <= generation - SHARED_GENERATIONS_KEPT:
+            shutil.rmtree(os.path.join(folder, name), ignore_errors=True)
+
+
+def shared_table_view(df, view):
+    # The published display columns next to the frame's own, both still pointing into their mapped files
+    return df[[column["id"] for column in TABLE_COLUMNS]].assign(**{column: view[column] for column in DISPLAY_COLUMNS})
+
+
+def attach_shared_snapshot(folder, timeout=300):
+    # Workers usually start before the loader has published, wait for the first generation
+    deadline = time.monotonic() + timeout
+    generation = read_generation(folder)
+    while generation is None:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"No snapshot published in {folder}, is the --publish loader running?")
+        time.sleep(0.5)
+        generation = read_generation(folder)
+
+    path = os.path.join(folder, f"g{generation:06d}")
+    with open(os.path.join(path, "manifest.json")) as file:
+        state = load_state(json.load(file), path)
+
+    # Text columns stay Arrow backed and point into the mapped file, nothing is copied
+    df = feather.read_table(os.path.join(path, "frame.arrow"), memory_map=True).to_pandas(split_blocks=True)
+    view = feather.read_table(os.path.join(path, "table.arrow"), memory_map=True).to_pandas(split_blocks=True)
+    genres = genre_pairs(df) if app_config.clientside else None
+
+    return Snapshot(
+        version=state["version"],
+        key=state["key"],
+        df=df,
+        year_options=state["year_options"],
+        unique_genres=state["unique_genres"],
+        genre_options=state["genre_options"],
+        end_months=state["end_months"],
+        appended=state["appended"],
+        index=BitmapIndex.from_state(state["index"]),
+        sort_orders=state["sort_orders"],
+        date_index=DateIntervalIndex.from_state(state["date_index"]),
+        slug_index=SlugIndex.from_state(state["slug_index"]),
+        table_view=shared_table_view(df, view),
+        search_index=SearchIndex.from_state(state["search_index"]),
+        rating_cube=RatingCube.from_state(state["rating_cube"]),
+        clientside=clientside_payload(df, state["version"], genres, state["unique_genres"]) if genres is not None else None,
+    )
+
+
+def publish_book_log(log_path, interval):
+    folder = shared_folder(log_path)
+    os.makedirs(folder, exist_ok=True)
+    # Never reuse a generation number, a worker may still have its files mapped
+    generation = max((int(name[1:]) for name in os.listdir(folder) if name.startswith("g")), default=0)
+    published = None
+
+    while True:
+        try:
+            key = workbook_key(log_path)
+            if published is None or key != published.key:
+                generation += 1
+                published = load_log_snapshot(log_path, generation, key, previous=published)
+                publish_snapshot(folder, published)
+                print(f"Published {log_path} (generation {generation})")
+        except Exception as error:  # Excel may still be writing the file, try again next poll
+            print(f"Could not publish {log_path}: {error}")
+        if interval <= 0:
+            return
+        time.sleep(interval)
+
+
+def watch_shared_snapshot(folder, interval):
+    global snapshot
+
+    while True:
+        time.sleep(interval)
+        try:
+            generation = read_generation(folder)
+            if snapshot is not None and generation is not None and generation != snapshot.version:
+                snapshot = attach_shared_snapshot(folder)  # Atomic swap, like reload_snapshot()
+                book_pages.clear()
+                figures.clear()
+        except Exception as error:  # The loader may have pruned that generation already, try again next poll
+            print(f"Could not attach generation {generation}: {error}")
+
+
+"""
+--------------------------------------------------
+SQLite backend
+--------------------------------------------------
+With --database the workbook is imported into a SQLite file (see
+BookDatabase.py) and the callbacks run parameterized queries against it
+instead of holding the log in memory. Each worker keeps its own pool of
+read-only connections. Whichever worker first sees a changed workbook
+re-imports it. The database's version number keys the caches.
+"""
+
+database = None  # ConnectionPool once the database matches the workbook, see current_database()
+
+
+def book_rows(df):
+    # The book log in BookDatabase's columns, dates as ISO strings so they sort and compare as text
+    rows = pd.DataFrame({column: df[name] for name, column in BookDatabase.BOOK_COLUMNS.items()})
+    for column in ("start_date", "end_date"):
+        rows[column] = rows[column].dt.strftime("%Y-%m-%d")
+
+    rows["slug"] = df["Book Link"].str[len("/book/"):]
+    rows["start_year"] = df["Start Year"]
+    rows["start_month"] = df["Start Month"]
+    rows["end_year"] = df["End Year"]
+    rows["end_month"] = df["End Month"]
+    rows["read_from"] = rows["start_date"].fillna(rows["end_date"])
+    rows["read_to"] = rows["end_date"].fillna("9999-12-31")  # Still being read
+    rows["rating_bin"] = rating_bins(df["Rating"])
+    rows["end_month_number"] = pd.Series(month_numbers(df["End Date"])).replace(OPEN_END, None)
+    return rows
+
+
+def sync_database(log_path, path):
+    # Import the workbook unless the database already holds this version of it
+    key = workbook_key(log_path)
+    if BookDatabase.stored_key(path) == dict(key, schema=BookDatabase.SCHEMA_VERSION):
+        return False
+    df = load_book_log(log_path)
+    return BookDatabase.import_book_log(path, book_rows(df), genre_pairs(df), key)
+
+
+def current_database():
+    global database, load_error
+
+    if database is None:
+        with snapshot_lock:
+            if database is None:  # Another thread may have imported it while we waited
+                try:
+                    sync_database(app_config.log_path, app_config.database)
+                    database = BookDatabase.ConnectionPool(app_config.database)
+                    load_error = None
+                except Exception as error:
+                    load_error = error
+                    raise
+    return database
+
+
+def watch_database(log_path, path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            if database is not None and sync_database(log_path, path):
+                print(f"Imported {log_path} into {path}")
+        except Exception as error:  # Excel may still be writing the file, try again next poll
+            print(f"Could not import {log_path}: {error}")
+
+
+"""
+--------------------------------------------------
+Tenants
+--------------------------------------------------
+With --tenants-dir one process serves every reader's log: /u/<user>/ and
+/u/<user>/book/<slug> read <tenants_dir>/<user>/Book Log.xlsx, each with
+its own .cache folder. Tenant snapshots are loaded on first use, kept in a
+TenantCache under the --tenant-memory-mb budget and reloaded by one watcher
+thread when their workbook changes. The default log keeps serving "/".
+"""
+
+TENANT_PATH = re.compile(r"^/u/([A-Za-z0-9_-]+)(/.*)?$")  # No dots, so a user name never leaves tenants_dir
+
+tenants = TenantCache(max_bytes=1024 * 2**20)  # Replaced by create_app() with the configured budget
+
+
+def split_tenant(pathname):
+    # (user, path within that reader's dashboard), user is None outside /u/
+    match = TENANT_PATH.match(pathname or "/")
+    if match is None:
+        return None, pathname or "/"
+    return match.group(1), match.group(2) or "/"
+
+
+def home_path(tenant):
+    return "/" if tenant is None else f"/u/{tenant}/"
+
+
+def tenant_log_path(user):
+    return os.path.join(app_config.tenants_dir, user, os.path.basename(DEFAULT_BOOK_LOG))
+
+
+def state_bytes(state):
+    if isinstance(state, np.ndarray):
+        return state.nbytes
+    if isinstance(state, dict):
+        return sum(state_bytes(value) for value in state.values())
+    if isinstance(state, (list, tuple)):
+        return sum(state_bytes(value) for value in state)
+    return 0
+
+
+def snapshot_bytes(snap):
+    # The frame plus every index array, the same state a shared snapshot publishes
+    indexes = [
+        snap.end_months, snap.index.to_state(), snap.sort_orders, snap.date_index.to_state(),
+        snap.search_index.to_state(), snap.rating_cube.to_state(), snap.slug_index.to_state(),
+    ]
+    # The table view's other columns share the frame's buffers
+    display_bytes = int(snap.table_view[DISPLAY_COLUMNS].memory_usage(deep=True).sum())
+    return int(snap.df.memory_usage(deep=True).sum()) + display_bytes + state_bytes(indexes)
+
+
+# Versions for every tenant load and reload. An evicted reader comes back with a new version,
+# so the caches keyed by (tenant, version) never serve what was built from their old log
+tenant_versions = count(1)
+
+
+def load_tenant(user):
+    path = tenant_log_path(user)
+    key = workbook_key(path)
+    return load_log_snapshot(path, next(tenant_versions), key, tenant=user)
+
+
+def page_snapshot(pathname):
+    # The snapshot a page belongs to: the reader's under /u/<user>/, the default log anywhere else
+    user, _ = split_tenant(pathname)
+    if user is None:
+        return current_snapshot()
+    return tenants.get(user, load_tenant)
+
+
+def watch_tenants(interval):
+    while True:
+        time.sleep(interval)
+        for user, snap in tenants.snapshots().items():
+            path = tenant_log_path(user)
+            try:
+                key = workbook_key(path)
+                if key != snap.key:
+                    reloaded = load_log_snapshot(path, next(tenant_versions), key, previous=snap, tenant=user)
+                    tenants.put(user, reloaded)
+                    print(f"Reloaded {path} (version {reloaded.version})")
+            except Exception as error:  # Excel may still be writing the file, try again next poll
+                print(f"Could not reload {path}: {error}")
+
+
+"""
+==================================================
+2. DASH APPLICATION FEATURES
+==================================================
+"""
+
+PAGE_SIZE = 25
+
+TABLE_COLUMNS = [
+    {"name": "Status", "id": "Status"},
+    {"name": "Book", "id": "Book"},
+    {"name": "Author", "id": "Author"},
+    {"name": "Rating", "id": "Rating"},
+    {"name": "Recommended By", "id": "Recommended By"},
+    {"name": "Start Date", "id": "Start Date"},
+    {"name": "End Date", "id": "End Date"},
+    {"name": "More Info", "id": "Book Link", "presentation": "markdown"},
+]
+
+"""
+==================================================
+3. DASH CALLBACKS
+==================================================
+"""
+
+def triggered_id():
+    try:
+        return ctx.triggered_id
+    except MissingCallbackContextException:  # Called directly rather than by Dash
+        return None
+
+
+def render_book_page(book_info, home="/"):
+    return html.Div([
+        html.H1(book_info["Book"], style={"textAlign": "center"}),
+        html.Hr(),
+        html.H3(f"Author: {book_info['Author']}"),
+        html.H3(f"Status: {book_info['Status']}"),
+        html.H3(f"Recommendation: {book_info['Rec?']}"),
+        html.H3(f"Recommended By: {book_info['Recommended By']}"),
+        html.H3(f"Start Date: {format_date(book_info['Start Date'])}"),
+        html.H3(f"End Date: {format_date(book_info['End Date'])}"),
+        html.P(f"Summary: {book_info['Summary']}"),
+        html.P(f"Core Themes: {book_info['Core Themes']}"),
+        html.P(f"Review: {book_info['Review']}"),
+        html.P(f"What I Gained from Reading: {book_info['What I gained from reading']}"),
+        html.P(f"Story Behind Finding the Book: {book_info['Story behind finding the book']}"),
+        html.H3(f"Genre: {book_info['Genre']}"),
+        html.H3(f"Personal Collection: {book_info['Personal Collection?']}"),
+        html.H3(f"Series/Standalone: {book_info['Series/Standalone?']}"),
+        html.H3(f"Page Count: {book_info['Page Ct.']}"),
+        html.A("Back to Home", href=home),
+    ])
+
+
+# Callback to display the correct page based on the URL
+def display_page(pathname):
+    user, pathname = split_tenant(pathname)
+    if user is not None and not (app_config.tenants_dir and os.path.exists(tenant_log_path(user))):
+        return html.H1("Reader Not Found")
+    snap = page_snapshot(home_path(user))  # Hold on to one data version for the whole render
+
+    if pathname.startswith("/book/"):
+        slug = unquote(pathname.split("/book/")[1])
+        position = snap.slug_index.get(slug)
+
+        if position is None:
+            return html.H1("Book Not Found")
+
+        page = book_pages.get((snap.tenant, snap.version, slug))
+        if page is None:
+            page = render_book_page(snap.df.iloc[position], home_path(user))
+            book_pages.put((snap.tenant, snap.version, slug), page)
+        note_rows(len(snap.df), 1)
+        return page
+
+    else:
+        first_day, last_day = snap.date_index.bounds()
+        if pathname == "/analytics":
+            return analytics_page(snap.year_options, snap.genre_options, first_day, last_day, home_path(user))
+        return home_page(snap.year_options, snap.genre_options, first_day, last_day, clientside_stores(snap), home_path(user))
+
+
+def home_page(year_options, genre_options, first_day, last_day, stores=(), home="/"):
+        return html.Div([
+    html.H1("Local Book Tracking Analytics Dashboard", style={"textAlign": "center", "fontFamily": "Arial, sans-serif"}),  
+    html.Div(html.A("Reading Analytics", href=f"{home}analytics"), style={"textAlign": "center", "fontFamily": "Arial, sans-serif"}),
+    html.Hr(),  
+
+    *filter_controls(year_options, genre_options, first_day, last_day),
+    html.Hr(),
+
+    # Table
+    dash_table.DataTable(
+        columns=TABLE_COLUMNS,
+        # Paging and sorting happen in update_table, only the visible page is sent
+        page_action="custom",
+        page_current=0,
+        page_size=PAGE_SIZE,
+        sort_action="custom",
+        sort_mode="single",
+        sort_by=[],
+        id="MainBookTable",
+        style_table={"width": "80%", "margin": "auto"},  
+        style_data={"fontFamily": "Arial, sans-serif", "fontSize": "14px", "fontWeight": "bold", "textAlign": "center"},
+        style_header={"fontFamily": "Arial, sans-serif", "fontSize": "22px", "fontWeight": "bold", "backgroundColor": "#f4f4f4", "textAlign": "center", "padding": "10px"},
+        style_data_conditional=[
+            {"if": {"column_id": "Status", "filter_query": '{Status} = "Complete"'}, "color": "green", "fontWeight": "bold", "fontStyle": "italic"},
+            {"if": {"column_id": "Status", "filter_query": '{Status} = "To Be Read"'}, "color": "#8B0000", "fontWeight": "bold", "fontStyle": "italic"},
+            {"if": {"column_id": "Status", "filter_query": '{Status} = "Reading"'}, "color": "orange", "fontWeight": "bold", "fontStyle": "italic"}
+        ]
+    ),   
+    html.Hr(),
+
+    dcc.Graph(id="ratings_histogram"),
+    html.Hr(),
+    dcc.Graph(id="bookspermonth"),
+
+    *stores
+])
+
+
+# The filters shared by the home and analytics pages, each page's callbacks read the same ids
+def filter_controls(year_options, genre_options, first_day, last_day):
+    return [
+        # Book Status Label and Dropdown
+        html.Div([
+            html.Label("Book Status:", style={"fontFamily": "Arial, sans-serif", "fontWeight": "bold", "fontSize": "16px", "width": "150px"}),
+            dcc.Dropdown(
+                ["Complete", "Reading", "To Be Read"], 
+                ["Complete"], 
+                multi=True, 
+                id="DropdownBookStatus", 
+                style={"width": "75%", "fontFamily": "Arial, sans-serif"}
+            )
+        ], style={"width": "75%", "margin": "auto", "display": "flex", "alignItems": "center", "gap": "10px"}),
+
+        # Recommendation Label and Dropdown
+        html.Div([
+            html.Label("Recommendation:", style={"fontSize": "16px", "fontFamily": "Arial, sans-serif", "fontWeight": "bold", "width": "150px"}),
+            dcc.Dropdown(
+                id="rec-dropdown",
+                options=[
+                    {"label": "Yes", "value": "Yes"},
+                    {"label": "No", "value": "No"},
+                ],
+                value=["Yes"],  # Default to 'Yes'
+                multi=True,  # Allow multiple selection
+                style={"width": "75%", "fontFamily": "Arial, sans-serif"}
+            ),
+        ], style={"width": "75%", "margin": "auto", "display": "flex", "alignItems": "center", "gap": "10px"}),
+
+        # Year Label
+        html.Div([
+            html.Label("Year:", style={"fontSize": "16px", "fontFamily": "Arial, sans-serif", "fontWeight": "bold", "width": "150px"}),
+            dcc.Dropdown(
+                id="year_dropdown",
+                options= year_options,
+                multi=True,
+                style={"width": "75%", "fontFamily": "Arial, sans-serif"}
+            ),
+        ], style={"width": "75%", "margin": "auto", "display": "flex", "alignItems": "center", "gap": "10px"}),
+
+        # Month Label
+
+            html.Div([
+            html.Label("Month:", style={"fontSize": "16px", "fontFamily": "Arial, sans-serif", "fontWeight": "bold", "width": "150px"}),
+            dcc.Dropdown(
+                id="month_dropdown",
+                options= month_options,
+                multi=True,
+                style={"width": "75%", "fontFamily": "Arial, sans-serif"}
+            ),
+        ], style={"width": "75%", "margin": "auto", "display": "flex", "alignItems": "center", "gap": "10px"}),
+
+        # Date Range, books that were being read at any point between the two dates
+        html.Div([
+            html.Label("Read Between:", style={"fontSize": "16px", "fontFamily": "Arial, sans-serif", "fontWeight": "bold", "width": "150px"}),
+            dcc.DatePickerRange(
+                id="date_range",
+                min_date_allowed=first_day,
+                max_date_allowed=last_day,
+                display_format="MMM D, YYYY",
+                clearable=True,
+                style={"fontFamily": "Arial, sans-serif"}
+            ),
+        ], style={"width": "75%", "margin": "auto", "display": "flex", "alignItems": "center", "gap": "10px"}),
+
+
+        # Search Bar
+        html.Div([
+            html.Label("Search:", style={"fontSize": "16px", "fontFamily": "Arial, sans-serif", "fontWeight": "bold", "width": "150px"}),
+            dcc.Input(
+                id="search-bar",
+                type="text",
+                placeholder="Search titles, authors, summaries, reviews...",
+                debounce=0.3,  # Wait for a pause in typing before searching
+                style={"width": "75%", "fontFamily": "Arial, sans-serif", "fontSize": "14px", "padding": "8px"}
+            ),
+        ], style={"width": "75%", "margin": "auto", "display": "flex", "alignItems": "center", "gap": "10px"}),
+
+        # Genre Dropdown
+        html.Div([
+            html.Label("Genre:", style={"fontFamily": "Arial, sans-serif", "fontWeight": "bold", "fontSize": "16px", "width": "150px"}),
+            dcc.Dropdown(options = genre_options, 
+                multi=True, 
+                id="genre_dropdown", 
+                style={"width": "75%", "fontFamily": "Arial, sans-serif"}
+            ),
+            dcc.RadioItems(
+                id="genre_match",
+                options=[
+                    {"label": "Any of", "value": "any"},
+                    {"label": "All of", "value": "all"},
+                ],
+                value="any",
+                inline=True,
+                style={"fontFamily": "Arial, sans-serif", "whiteSpace": "nowrap"}
+            ),
+        ], style={"width": "75%", "margin": "auto", "display": "flex", "alignItems": "center", "gap": "10px"}),
+    ]
+
+
+def clientside_stores(snap):
+    if not app_config.clientside:
+        return []
+    return [
+        dcc.Store(id="book-store", data=snap.clientside),  # The whole log, sent once per page load
+        dcc.Store(id="search-hits"),  # Ranked row positions for the current search, filled by the server
+    ]
+
+
+def update_table(status_values, rec_values, selected_years, selected_months, selected_genres, genre_match, start_date, end_date, search_query, page_current, page_size, sort_by, pathname=None):
+    snap = page_snapshot(pathname)
+    mask = filter_mask(snap, status_values, rec_values, selected_years, selected_months, selected_genres, genre_match, start_date, end_date)
+    sort_by = sortable(sort_by)
+
+    # Narrow by search, ranking the matches by relevance unless a column sort is chosen
+    searching = bool(search_query and search_query.strip())
+    if searching:
+        matches, scores = snap.search_index.search(search_query)
+        mask &= matches
+
+    if searching and not sort_by:
+        rows = np.flatnonzero(mask)
+        rows = rows[np.argsort(-scores[rows], kind="stable")]
+    else:
+        rows = sorted_rows(snap.sort_orders, mask, sort_by)
+    page_count, page_current = table_position(len(rows), page_current, page_size)
+
+    # Gather only the visible page from the preformatted table columns
+    page_rows = rows[page_current * page_size:(page_current + 1) * page_size]
+    records = snap.table_view.iloc[page_rows].to_dict("records")
+
+    note_rows(len(snap.df), len(records))
+    return records, page_count, page_current
+
+
+def filter_mask(snap, status_values, rec_values, selected_years, selected_months, selected_genres, genre_match, start_date, end_date):
+    index = snap.index
+
+    # Filter by Status and Recommendation
+    mask = index.any_of("Status", status_values or [])
+    if rec_values:
+        mask &= index.any_of("Rec?", rec_values)
+
+    # Filter by Year (Optional)
+    if selected_years:
+        start_years = index.any_of("Start Year", selected_years)
+        end_years = index.any_of("End Year", selected_years)
+        mask &= start_years | end_years
+
+    # Filter by Month (Only if Years are Selected)
+    if selected_months:
+        start_months = index.any_of("Start Month", selected_months)
+        end_months = index.any_of("End Month", selected_months)
+        if selected_years:  # Ensure that year filtering is applied
+            mask &= (start_years & start_months) | (end_years & end_months)
+        else:  # If no year selected, just filter by month alone
+            mask &= start_months | end_months
+
+    # Filter by Genre, books with any or all of the selected genres
+    if selected_genres:
+        mask &= genre_mask(index, selected_genres, genre_match)
+
+    # Filter by Date Range, books read at any point in the period
+    if start_date or end_date:
+        mask &= snap.date_index.overlapping(picker_day(start_date), picker_day(end_date))
+
+    return mask
+
+
+def table_position(matches, page_current, page_size):
+    page_count = max(1, -(-matches // page_size))
+
+    # A new filter starts back on the first page, paging and sorting keep the current one
+    if triggered_id() not in (None, "MainBookTable"):
+        page_current = 0
+    return page_count, min(page_current or 0, page_count - 1)
+
+
+def table_records(page_df):
+    # Pages that do not come from a snapshot (the SQLite backend) are formatted one page at a time
+    return table_view(page_df).to_dict("records")
+
+# Update visualization based on recommendation filter
+def update_vis(rec_values, year_values, month_values, genre_values, genre_match, start_date, end_date, pathname=None):
+    snap = page_snapshot(pathname)
+
+    # Sessions that pick the same filters in a different order share one cached figure
+    genres = filter_key(genre_values)
+    key = (
+        (snap.tenant, snap.version), filter_key(rec_values), filter_key(year_values), filter_key(month_values),
+        genres, genre_match if genres else None, (picker_day(start_date), picker_day(end_date)),
+    )
+    vis = figures.get(key)
+    if vis is None:
+        vis = make_ratings_histogram(snap, *key[1:])
+        figures.put(key, vis)
+    note_rows(len(snap.df), len(vis.data[0].x))  # One row per drawn bin
+    return vis
+
+
+def filter_key(values):
+    if not values or "All" in values:  # Check for None or empty
+        return ()
+    return tuple(sorted(set(values)))
+
+
+def genre_mask(index, genres, match, start=0):
+    if match == "all":
+        return index.all_of("Genre", genres, start)
+    return index.any_of("Genre", genres, start)
+
+
+def histogram_mask(index, rec_values, year_values, month_values):
+    mask = index.everything()
+
+    if rec_values:
+        # Filter based on selected values for 'Rec?'
+        mask &= index.any_of("Rec?", rec_values)
+
+    if year_values:
+        # Filter based on both Start Year and End Year
+        mask &= index.any_of("Start Year", year_values) | index.any_of("End Year", year_values)
+
+    if month_values:
+        # Filter based on both Start Month and End Month
+        mask &= index.any_of("Start Month", month_values) | index.any_of("End Month", month_values)
+
+    return mask
+
+
+def make_ratings_histogram(snap, rec_values, year_values, month_values, genre_values=(), genre_match=None, date_range=(None, None)):
+    cube = snap.rating_cube
+
+    if genre_values or date_range != (None, None):
+        # Genres and date ranges are not cube dimensions, count the matching books' bins instead
+        mask = histogram_mask(snap.index, rec_values, year_values, month_values)
+        if genre_values:
+            mask &= genre_mask(snap.index, genre_values, genre_match)
+        if date_range != (None, None):
+            mask &= snap.date_index.overlapping(*date_range)
+        counts = cube.book_counts(mask)
+    else:
+        # Sum the matching cube cells per rating bin
+        counts = cube.counts(histogram_mask(cube.index, rec_values, year_values, month_values))
+
+    return ratings_histogram_figure(counts)
+
+
+def ratings_histogram_figure(counts):
+    # Only bins with books are drawn
+    bins = np.flatnonzero(counts)
+    lower_edges = bins * RATING_BIN_WIDTH
+    upper_edges = lower_edges + RATING_BIN_WIDTH
+
+    # Create histogram, colored by the Low / Medium / High rating category
+    vis = go.Figure(go.Bar(
+        x=lower_edges + RATING_BIN_WIDTH / 2,
+        y=counts[bins],
+        width=RATING_BIN_WIDTH,
+        marker_color=[RATING_COLORS[rating_category(edge)] for edge in upper_edges],
+        customdata=np.column_stack([lower_edges, upper_edges]),
+        hovertemplate='Rating: %{customdata[0]}-%{customdata[1]}<br>Books: %{y}<extra></extra>',
+    ))
+    return style_ratings_histogram(vis)
+
+
+# Books read per month for the selected statuses, recommendations and genres
+def update_bookspermonth(status_values, rec_values, genre_values, genre_match, pathname=None):
+    snap = page_snapshot(pathname)
+
+    genres = filter_key(genre_values)
+    filters = (filter_key(status_values), filter_key(rec_values), genres, genre_match if genres else None)
+    first, counts = filtered_month_counts(snap, filters)
+    note_rows(len(snap.df), len(counts))  # One row per month
+    return make_bookspermonth(monthly_series(first, counts))
+
+
+def monthly_mask(snap, filters, start=0):
+    status_values, rec_values, genre_values, genre_match = filters
+    mask = snap.index.everything(start)
+    if status_values:
+        mask &= snap.index.any_of("Status", status_values, start)
+    if rec_values:
+        mask &= snap.index.any_of("Rec?", rec_values, start)
+    if genre_values:
+        mask &= genre_mask(snap.index, genre_values, genre_match, start)
+    return mask
+
+
+def filtered_month_counts(snap, filters):
+    cached = month_counts.get((snap.tenant, filters))
+    if cached is not None and cached[0] == snap.version:
+        return cached[1]
+
+    if cached is not None and snap.appended is not None and cached[0] == snap.appended[0]:
+        # Only rows were added since the cached counts, count just those and add them in
+        start = snap.appended[1]
+        counts = add_month_counts(cached[1], count_months(snap.end_months[start:][monthly_mask(snap, filters, start)]))
+    else:
+        counts = count_months(snap.end_months[monthly_mask(snap, filters)])
+
+    month_counts.put((snap.tenant, filters), (snap.version, counts))
+    return counts
+
+
+# Search stays on the server in --clientside mode, the browser only gets the ranked matches
+def update_search_hits(search_query, pathname=None):
+    snap = page_snapshot(pathname)
+    if not (search_query and search_query.strip()):
+        return None
+
+    matches, scores = snap.search_index.search(search_query)
+    rows = np.flatnonzero(matches)
+    note_rows(len(snap.df), len(rows))
+    return {"version": snap.version, "rows": rows[np.argsort(-scores[rows], kind="stable")].tolist()}
+
+
+"""
+--------------------------------------------------
+Reading analytics page
+--------------------------------------------------
+/analytics promotes the Bubblevistest.py prototypes to a page that follows
+the home page filters: page count against rating for every matching book,
+and a Genre > Author treemap. The scatter is a single scattergl trace. Past
+SCATTER_MAX_POINTS it shows a sample drawn from every cell of a page x
+rating grid in proportion to how full the cell is, so dense areas stay
+dense and lone outliers stay visible. The treemap counts (genre, author)
+pairs from the exploded genre lists, coded once per snapshot.
+"""
+
+SCATTER_MAX_POINTS = 5000
+SCATTER_GRID = (100, 40)  # Page count x rating cells the sample is spread over
+TREEMAP_AUTHORS_PER_GENRE = 20  # The rest of a genre's authors are shown as one block
+
+# Numeric columns and genre x author codes for the analytics page, keyed by (tenant, snapshot version)
+analytics_columns = LRUCache(maxsize=8)
+
+
+def analytics_page(year_options, genre_options, first_day, last_day, home="/"):
+    return html.Div([
+        html.H1("Reading Analytics", style={"textAlign": "center", "fontFamily": "Arial, sans-serif"}),
+        html.Div(html.A("Back to Home", href=home), style={"textAlign": "center", "fontFamily": "Arial, sans-serif"}),
+        html.Hr(),
+        *filter_controls(year_options, genre_options, first_day, last_day),
+        html.Hr(),
+        dcc.Graph(id="pages_vs_rating"),
+        html.Hr(),
+        dcc.Graph(id="genre_treemap", style={"height": "700px"}),
+    ])
+
+
+def snapshot_analytics(snap):
+    key = (snap.tenant, snap.version)
+    columns = analytics_columns.get(key)
+    if columns is None:
+        df = snap.df
+        pairs = genre_pairs(df)
+        genre_codes, genres = pd.factorize(pairs, sort=True)
+        author_codes, authors = pd.factorize(df["Author"], sort=True)  # Missing authors get -1
+        columns = {
+            "pages": pd.to_numeric(df["Page Ct."], errors="coerce").to_numpy(dtype=float),
+            "ratings": df["Rating"].to_numpy(dtype=float),
+            "pair_rows": pairs.index.to_numpy(),
+            "pair_genres": genre_codes,
+            "genres": np.asarray(genres, dtype=object),
+            "author_codes": author_codes,
+            "authors": np.append(np.asarray(authors, dtype=object), "Unknown Author"),
+        }
+        analytics_columns.put(key, columns)
+    return columns
+
+
+def density_sample(x, y, rows, max_points):
+    # Keep about max_points rows, at least one from every occupied grid cell and otherwise in proportion
+    if len(rows) <= max_points:
+        return rows
+
+    cells_x = np.clip(((x - x.min()) / (np.ptp(x) or 1) * SCATTER_GRID[0]).astype(np.int64), 0, SCATTER_GRID[0] - 1)
+    cells_y = np.clip(((y - y.min()) / (np.ptp(y) or 1) * SCATTER_GRID[1]).astype(np.int64), 0, SCATTER_GRID[1] - 1)
+    cells = cells_x * SCATTER_GRID[1] + cells_y
+
+    # A fixed pseudo random order per book, so the same books stay on screen as the filters change
+    order = np.lexsort(((rows * 2654435761) % 2**32, cells))
+    sorted_cells = cells[order]
+    rank = np.arange(len(order)) - np.searchsorted(sorted_cells, sorted_cells)
+    quota = np.maximum(1, np.bincount(cells) * max_points // len(rows))
+    return np.sort(rows[order[rank < quota[sorted_cells]]])
+
+
+def pages_rating_scatter(snap, columns, mask):
+    from plotly.colors import qualitative  # Only needed once the page is drawn
+
+    pages, ratings = columns["pages"], columns["ratings"]
+    rows = np.flatnonzero(mask & ~np.isnan(pages) & ~np.isnan(ratings))
+    shown = density_sample(pages[rows], ratings[rows], rows, SCATTER_MAX_POINTS)
+
+    # Colored by author like the prototype, from a fixed palette rather than one trace per author
+    palette = np.array(qualitative.Dark24)
+    colors = palette[columns["author_codes"][shown] % len(palette)]
+
+    title = "Page Count vs Rating"
+    if len(shown) < len(rows):
+        title += f" ({len(shown):,} of {len(rows):,} books, sampled by density)"
+
+    scatter = go.Figure(go.Scattergl(
+        x=pages[shown],
+        y=ratings[shown],
+        mode="markers",
+        marker=dict(color=colors, size=8, opacity=0.75),
+        customdata=np.column_stack([snap.df["Book"].to_numpy()[shown], snap.df["Author"].to_numpy()[shown]]),
+        hovertemplate="<b>%{customdata[0]}</b><br>%{customdata[1]}<br>Pages: %{x}<br>Rating: %{y}<extra></extra>",
+    ))
+    scatter.update_layout(
+        title={"text": title, "font": {"family": "Arial, sans-serif", "size": 24, "color": "black", "weight": "bold"}, "x": 0.5, "xanchor": "center"},
+        xaxis=dict(title="Page Count", showgrid=True, zeroline=False, linecolor="black"),
+        yaxis=dict(title="Rating", showgrid=True, zeroline=False),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        hoverlabel=dict(bgcolor="rgba(255,255,255,0.7)", font_size=14, font_family="Arial, sans-serif", font_color="black"),
+        margin=dict(t=60, b=40, l=50, r=40),
+        hovermode="closest",
+    )
+    return scatter
+
+
+def genre_treemap(columns, mask):
+    # One count per (genre, author) among the matching books' exploded genre lists
+    keep = mask[columns["pair_rows"]]
+    authors = columns["author_codes"][columns["pair_rows"][keep]]
+    authors = np.where(authors < 0, len(columns["authors"]) - 1, authors)
+    keys, counts = np.unique(columns["pair_genres"][keep].astype(np.int64) * len(columns["authors"]) + authors, return_counts=True)
+
+    pairs = pd.DataFrame({"genre": keys // len(columns["authors"]), "author": keys % len(columns["authors"]), "books": counts})
+    pairs = pairs.sort_values(["genre", "books"], ascending=[True, False], kind="stable")
+    pairs["rank"] = pairs.groupby("genre").cumcount()
+
+    # A genre's smaller authors become one "Other authors" block so the treemap stays readable
+    top = pairs[pairs["rank"] < TREEMAP_AUTHORS_PER_GENRE]
+    rest = pairs[pairs["rank"] >= TREEMAP_AUTHORS_PER_GENRE].groupby("genre")["books"].sum()
+    genre_totals = pairs.groupby("genre")["books"].sum()
+
+    genre_names = columns["genres"][genre_totals.index.to_numpy()]
+    leaf_genres = columns["genres"][top["genre"].to_numpy()]
+    rest_genres = columns["genres"][rest.index.to_numpy()]
+
+    ids = list(genre_names) + [f"{genre}/{author}" for genre, author in zip(leaf_genres, columns["authors"][top["author"].to_numpy()])] + [f"{genre}/Other authors" for genre in rest_genres]
+    labels = list(genre_names) + list(columns["authors"][top["author"].to_numpy()]) + ["Other authors"] * len(rest)
+    parents = [""] * len(genre_names) + list(leaf_genres) + list(rest_genres)
+    values = np.concatenate([genre_totals.to_numpy(), top["books"].to_numpy(), rest.to_numpy()])
+
+    treemap = go.Figure(go.Treemap(
+        ids=ids,
+        labels=labels,
+        parents=parents,
+        values=values,
+        branchvalues="total",
+        marker=dict(colors=values, colorscale="RdYlGn"),
+        hovertemplate="<b>%{label}</b><br>Books: %{value}<extra></extra>",
+    ))
+    treemap.update_layout(
+        title={"text": "Books by Genre and Author", "font": {"family": "Arial, sans-serif", "size": 24, "color": "black", "weight": "bold"}, "x": 0.5, "xanchor": "center"},
+        margin=dict(t=60, b=10, l=10, r=10),
+    )
+    return treemap
+
+
+def update_analytics(status_values, rec_values, selected_years, selected_months, selected_genres, genre_match, start_date, end_date, search_query, pathname=None):
+    snap = page_snapshot(pathname)
+    mask = filter_mask(snap, status_values, rec_values, selected_years, selected_months, selected_genres, genre_match, start_date, end_date)
+    if search_query and search_query.strip():
+        mask &= snap.search_index.search(search_query)[0]
+
+    # Any filters that pick the same books share the figures
+    key = ("analytics", snap.tenant, snap.version, hashlib.blake2b(np.packbits(mask).tobytes(), digest_size=16).digest())
+    figures_pair = figures.get(key)
+    if figures_pair is None:
+        columns = snapshot_analytics(snap)
+        figures_pair = (pages_rating_scatter(snap, columns, mask), genre_treemap(columns, mask))
+        figures.put(key, figures_pair)
+
+    note_rows(len(snap.df), int(mask.sum()))
+    return figures_pair
+
+
+"""
+--------------------------------------------------
+Callbacks for the SQLite backend
+--------------------------------------------------
+Same inputs and outputs as the callbacks above, with the filters pushed
+down into BookDatabase queries. Only the visible page, the histogram bins
+and the month counts come back from the database.
+"""
+
+def picker_date(value):
+    return value[:10] if value else None  # The picker may add a time after the ISO date
+
+
+def sql_display_page(pathname):
+    with current_database().connection() as connection:
+        version = BookDatabase.version(connection)
+
+        if pathname.startswith("/book/"):
+            slug = unquote(pathname.split("/book/")[1])
+            page = book_pages.get(("sql", version, slug))
+            if page is None:
+                book_info = BookDatabase.book_by_slug(connection, slug)
+                if book_info is None:
+                    return html.H1("Book Not Found")
+                book_info = {name: np.nan if value is None else value for name, value in book_info.items()}  # Shown like the in-memory page
+                book_info["Start Date"] = pd.to_datetime(book_info["Start Date"])
+                book_info["End Date"] = pd.to_datetime(book_info["End Date"])
+                page = render_book_page(book_info)
+                book_pages.put(("sql", version, slug), page)
+            return page
+
+        if pathname == "/analytics":
+            return html.H1("Reading Analytics needs the in-memory book log, start without --database")
+        years, genres, (first_day, last_day) = BookDatabase.home_options(connection)
+
+    year_options = [{"label": str(year), "value": year} for year in years]
+    genre_options = [{"label": genre, "value": genre} for genre in genres]
+    return home_page(year_options, genre_options, first_day, last_day)
+
+
+def sql_update_table(status_values, rec_values, selected_years, selected_months, selected_genres, genre_match, start_date, end_date, search_query, page_current, page_size, sort_by):
+    filters = {
+        "status": status_values or [],
+        "rec": rec_values,
+        "years": selected_years,
+        "months": selected_months,
+        "pair_months": True,  # Months only count in the selected years, like update_table
+        "genres": selected_genres,
+        "genre_match": genre_match,
+        "first_day": picker_date(start_date),
+        "last_day": picker_date(end_date),
+        "words": query_words(search_query) if search_query else [],
+    }
+
+    with current_database().connection() as connection:
+        matches = BookDatabase.count_books(connection, filters)
+        page_count, page_current = table_position(matches, page_current, page_size)
+        sort_by = sortable(sort_by)
+        page_df = BookDatabase.table_page(connection, filters, sort_by[0] if sort_by else None, page_current * page_size, page_size)
+
+    page_df = page_df.assign(**{
+        "Rating": page_df["Rating"].astype(float),
+        "Start Date": pd.to_datetime(page_df["Start Date"]),
+        "End Date": pd.to_datetime(page_df["End Date"]),
+    })
+
+    note_rows(matches, len(page_df))
+    return table_records(page_df), page_count, page_current
+
+
+def sql_update_vis(rec_values, year_values, month_values, genre_values, genre_match, start_date, end_date):
+    with current_database().connection() as connection:
+        genres = filter_key(genre_values)
+        key = (
+            ("sql", BookDatabase.version(connection)), filter_key(rec_values), filter_key(year_values), filter_key(month_values),
+            genres, genre_match if genres else None, (picker_date(start_date), picker_date(end_date)),
+        )
+        vis = figures.get(key)
+        if vis is None:
+            filters = {
+                "rec": key[1], "years": key[2], "months": key[3], "genres": key[4], "genre_match": key[5],
+                "first_day": key[6][0], "last_day": key[6][1],
+            }
+            vis = ratings_histogram_figure(BookDatabase.rating_counts(connection, filters, RATING_BINS))
+            figures.put(key, vis)
+
+    note_rows(len(vis.data[0].x), len(vis.data[0].x))  # One row per drawn bin
+    return vis
+
+
+def sql_update_bookspermonth(status_values, rec_values, genre_values, genre_match):
+    genres = filter_key(genre_values)
+    filters = {
+        "status": filter_key(status_values) or None,  # No status selected shows every book here
+        "rec": filter_key(rec_values),
+        "genres": genres,
+        "genre_match": genre_match,
+    }
+    with current_database().connection() as connection:
+        first, counts = BookDatabase.month_counts(connection, filters)
+
+    note_rows(len(counts), len(counts))  # One row per month
+    return make_bookspermonth(monthly_series(first, counts))
+
+
+def register_callbacks(app, config):
+    if config.database:
+        callbacks = sql_display_page, sql_update_table, sql_update_vis, sql_update_bookspermonth
+    else:
+        callbacks = display_page, update_table, update_vis, update_bookspermonth
+    page_callback, table_callback, vis_callback, bookspermonth_callback = callbacks
+
+    app.callback(
+        Output("page-content", "children"),
+        Input("url", "pathname")
+    )(page_callback)
+
+    bookspermonth_inputs = [
+        Input("DropdownBookStatus", "value"),
+        Input("rec-dropdown", "value"),
+        Input("genre_dropdown", "value"),
+        Input("genre_match", "value"),
+    ]
+
+    # With tenants the server callbacks also read the URL, to know whose log the page shows
+    tenant_state = [State("url", "pathname")] if config.tenants_dir else []
+
+    if not config.clientside:
+        app.callback(
+            Output("MainBookTable", "data"),
+            Output("MainBookTable", "page_count"),
+            Output("MainBookTable", "page_current"),
+            [
+                Input("DropdownBookStatus", "value"),
+                Input("rec-dropdown", "value"),
+                Input("year_dropdown", "value"),
+                Input("month_dropdown", "value"),
+                Input("genre_dropdown", "value"),
+                Input("genre_match", "value"),
+                Input("date_range", "start_date"),
+                Input("date_range", "end_date"),
+                Input("search-bar", "value"),
+                Input("MainBookTable", "page_current"),
+                Input("MainBookTable", "page_size"),
+                Input("MainBookTable", "sort_by"),
+                *tenant_state,
+            ]
+        )(table_callback)
+
+        app.callback(
+            Output("ratings_histogram", "figure"),
+            Input("rec-dropdown", "value"),
+            Input("year_dropdown", "value"),  # Year filter
+            Input("month_dropdown", "value"),  # Month filter
+            Input("genre_dropdown", "value"),  # Genre filter
+            Input("genre_match", "value"),
+            Input("date_range", "start_date"),  # Date range filter
+            Input("date_range", "end_date"),
+            *tenant_state,
+        )(vis_callback)
+
+        app.callback(Output("bookspermonth", "figure"), *bookspermonth_inputs, *tenant_state)(bookspermonth_callback)
+
+    if not config.database:
+        app.callback(
+            Output("pages_vs_rating", "figure"),
+            Output("genre_treemap", "figure"),
+            Input("DropdownBookStatus", "value"),
+            Input("rec-dropdown", "value"),
+            Input("year_dropdown", "value"),
+            Input("month_dropdown", "value"),
+            Input("genre_dropdown", "value"),
+            Input("genre_match", "value"),
+            Input("date_range", "start_date"),
+            Input("date_range", "end_date"),
+            Input("search-bar", "value"),
+            *tenant_state,
+        )(update_analytics)
+
+    if not config.clientside:
+        return
+
+    # In --clientside mode assets/clientside.js handles the home page filters instead
+    app.clientside_callback(
+        ClientsideFunction(namespace="books", function_name="filterTable"),
+        Output("MainBookTable", "data"),
+        Output("MainBookTable", "page_count"),
+        Output("MainBookTable", "page_current"),
+        Input("book-store", "data"),
+        Input("DropdownBookStatus", "value"),
+        Input("rec-dropdown", "value"),
+        Input("year_dropdown", "value"),
+        Input("month_dropdown", "value"),
+        Input("genre_dropdown", "value"),
+        Input("genre_match", "value"),
+        Input("date_range", "start_date"),
+        Input("date_range", "end_date"),
+        Input("search-hits", "data"),
+        Input("MainBookTable", "page_current"),
+        Input("MainBookTable", "page_size"),
+        Input("MainBookTable", "sort_by"),
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="books", function_name="ratingsHistogram"),
+        Output("ratings_histogram", "figure"),
+        Input("book-store", "data"),
+        Input("rec-dropdown", "value"),
+        Input("year_dropdown", "value"),
+        Input("month_dropdown", "value"),
+        Input("genre_dropdown", "value"),
+        Input("genre_match", "value"),
+        Input("date_range", "start_date"),
+        Input("date_range", "end_date"),
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="books", function_name="booksPerMonth"),
+        Output("bookspermonth", "figure"),
+        Input("book-store", "data"),
+        *bookspermonth_inputs,
+    )
+
+    app.callback(
+        Output("search-hits", "data"),
+        Input("search-bar", "value"),
+        *tenant_state,
+    )(update_search_hits)
+
+
+"""
+==================================================
+4. APP FACTORY
+==================================================
+create_app() builds the Dash app for one Config. Creating it is cheap: the
+book log is loaded in the background (or by the first request when warm is
+off), and /healthz answers straight away with whether the data is ready yet.
+"""
+
+def health():
+    snap = snapshot
+    if snap is not None or database is not None:
+        state = "ready"
+    elif load_error is not None:
+        state = "error"
+    else:
+        state = "loading"
+
+    version = snap.version if snap else None
+    if database is not None:
+        with database.connection() as connection:
+            version = BookDatabase.version(connection)
+
+    body = {"status": "ok", "data": state, "version": version}
+    if state == "error":
+        body["error"] = str(load_error)
+    return body
+
+
+def metrics_lines():
+    lines = ["# HELP dash_cache_requests_total Cache lookups by cache and result.", "# TYPE dash_cache_requests_total counter"]
+    for name, cache in (("figures", figures), ("book_pages", book_pages), ("tenants", tenants)):
+        lines.append(f'dash_cache_requests_total{{cache="{name}",result="hit"}} {cache.hits}')
+        lines.append(f'dash_cache_requests_total{{cache="{name}",result="miss"}} {cache.misses}')
+    lines += [
+        "# HELP book_log_snapshot_version Version of the book log snapshot being served.",
+        "# TYPE book_log_snapshot_version gauge",
+        f"book_log_snapshot_version {snapshot.version if snapshot else 0}",
+        "# HELP tenant_snapshots_bytes Estimated memory held by the loaded tenants' book logs.",
+        "# TYPE tenant_snapshots_bytes gauge",
+        f"tenant_snapshots_bytes {tenants.total_bytes()}",
+        "# HELP tenant_evictions_total Tenants dropped to stay under the memory budget.",
+        "# TYPE tenant_evictions_total counter",
+        f"tenant_evictions_total {tenants.evictions}",
+    ]
+    return lines
+
+
+# Callback responses and the layout are JSON, the page itself HTML. Dash's fingerprinted
+# scripts are cached by the browser, so compressing them on every request isn't worth it.
+COMPRESSED_TYPES = {"application/json", "text/html"}
+COMPRESS_MIN_BYTES = 1024
+
+
+def compress_response(response):
+    if (response.direct_passthrough or response.status_code != 200 or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSED_TYPES):
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+
+    if brotli is not None and request.accept_encodings["br"]:
+        response.set_data(brotli.compress(body, quality=5))  # Fast enough per request, close to gzip -9 in size
+        response.headers["Content-Encoding"] = "br"
+    elif request.accept_encodings["gzip"]:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def create_app(config=None):
+    global app_config, snapshot, database, tenants, load_error
+
+    # One dashboard per process, the callbacks read the data through module globals
+    config = config or Config()
+    if config.database and (config.clientside or config.shared):
+        raise ValueError("--database serves the book log from SQLite, it cannot be combined with --clientside or --shared")
+    if config.tenants_dir and (config.database or config.shared):
+        raise ValueError("--tenants-dir keeps each reader's log in memory, it cannot be combined with --database or --shared")
+    app_config = config
+    snapshot = None
+    database = None
+    tenants = TenantCache(max_bytes=int(config.tenant_memory_mb * 2**20))
+    load_error = None
+    book_pages.clear()
+    figures.clear()
+    month_counts.clear()
+
+    app = Dash(__name__, suppress_callback_exceptions=True)
+    app.layout = html.Div([
+        dcc.Location(id="url", refresh=False),  # Tracks URL changes
+        html.Div(id="page-content"),  # Placeholder for different pages (content changes here)
+    ])
+    register_callbacks(app, app_config)
+
+    # Liveness always answers, readiness waits for the first snapshot
+    @app.server.route("/healthz")
+    def healthz():
+        return Response(json.dumps(health()), mimetype="application/json")
+
+    @app.server.route("/readyz")
+    def readyz():
+        body = health()
+        return Response(json.dumps(body), status=200 if body["data"] == "ready" else 503, mimetype="application/json")
+
+    if app_config.compress:
+        app.server.after_request(compress_response)
+
+    if app_config.metrics:
+        CallbackMetrics.instrument_callbacks(app, slow_ms=app_config.slow_callback_ms)
+
+        @app.server.route("/metrics")
+        def metrics():
+            return Response(CallbackMetrics.render_metrics(metrics_lines()), mimetype="text/plain; version=0.0.4")
+
+    if app_config.profile:
+        CallbackProfiler.profile_callbacks(
+            app, app_config.profile, sample_rate=app_config.profile_sample, min_ms=app_config.profile_min_ms, memory=app_config.profile_memory,
+        )
+
+    if app_config.warm:
+        threading.Thread(target=warm_snapshot, daemon=True).start()
+    if app_config.watch_interval > 0 and app_config.database:
+        threading.Thread(target=watch_database, args=(app_config.log_path, app_config.database, app_config.watch_interval), daemon=True).start()
+    elif app_config.watch_interval > 0 and app_config.shared:
+        threading.Thread(target=watch_shared_snapshot, args=(shared_folder(app_config.log_path), app_config.watch_interval), daemon=True).start()
+    elif app_config.watch_interval > 0:
+        threading.Thread(target=watch_book_log, args=(app_config.log_path, app_config.watch_interval), daemon=True).start()
+    if app_config.watch_interval > 0 and app_config.tenants_dir:
+        threading.Thread(target=watch_tenants, args=(app_config.watch_interval,), daemon=True).start()
+    return app
+
+
+"""
+==================================================
+5. STATIC EXPORT
+==================================================
+--export writes the dashboard as plain HTML (see StaticExport.py) for
+readers who only need a read-only copy. The book pages are the same
+render_book_page() the server shows, and the home page figures are the
+ones update_vis() and update_bookspermonth() draw for the default filters.
+Only pages whose source rows changed since the last export are rewritten.
+"""
+
+def listing_name(page):
+    return "index.html" if page == 0 else f"page-{page + 1}.html"
+
+
+def listing_page(snap, rows, page, page_count, figures_html):
+    # The exported pages link to book/<slug>.html instead of the server's /book/<slug>
+    links = "book/" + snap.df["Book Link"].iloc[rows].str.slice(len("/book/")) + ".html"
+    records = snap.table_view.iloc[rows].assign(**{"Book Link": links}).to_dict("records")
+
+    links = []
+    if page > 0:
+        links.append(f'<a href="{listing_name(page - 1)}">Previous</a>')
+    links.append(f"Page {page + 1} of {page_count}")
+    if page + 1 < page_count:
+        links.append(f'<a href="{listing_name(page + 1)}">Next</a>')
+    navigation = f'<p style="text-align: center">{" | ".join(links)}</p>'
+
+    body = (
+        '<h1 style="text-align: center">Local Book Tracking Analytics Dashboard</h1>\n<hr>\n'
+        + figures_html + navigation + "\n" + StaticExport.table_html(records, TABLE_COLUMNS, link_column="Book Link") + "\n" + navigation
+    )
+    return StaticExport.html_document("Local Book Tracking Analytics Dashboard", body)
+
+
+def export_site(log_path, folder, max_workers=None):
+    global snapshot
+
+    started = time.perf_counter()
+    snapshot = snap = load_log_snapshot(log_path, 1, workbook_key(log_path))
+    df = snap.df
+    os.makedirs(folder, exist_ok=True)
+    previous = StaticExport.load_manifest(folder)
+
+    # A book page changes when its source row does, the file name already carries the slug
+    hashes = StaticExport.row_hashes(df[[column for column in BookLogReader.LOG_COLUMNS if column in df.columns]])
+    book_names = [f"book{link[len('/book'):]}.html" for link in df["Book Link"]]
+    pages = {name: f"{digest:016x}" for name, digest in zip(book_names, hashes)}
+    written = StaticExport.export_book_pages(folder, df, book_names, list(pages.values()), render_static_book_page, previous, max_workers)
+
+    # Listing pages only depend on their own rows, except the first one whose figures cover the whole log
+    page_count = max(1, -(-len(df) // StaticExport.LISTING_ROWS))
+    for page in range(page_count):
+        rows = np.arange(page * StaticExport.LISTING_ROWS, min(len(df), (page + 1) * StaticExport.LISTING_ROWS))
+        name = listing_name(page)
+        source = hashes if page == 0 else hashes[rows]
+        pages[name] = StaticExport.combined_hash(source, "|".join(book_names[row] for row in rows), page_count)
+        if previous.get(name) == pages[name] and os.path.exists(os.path.join(folder, name)):
+            continue
+
+        figures_html = ""
+        if page == 0:
+            if not os.path.exists(os.path.join(folder, "plotly.min.js")):
+                from plotly.offline import get_plotlyjs
+                StaticExport.write_page(folder, "plotly.min.js", get_plotlyjs())
+            vis = update_vis(["Yes"], None, None, None, "any", None, None)
+            bookspermonth = update_bookspermonth(["Complete"], ["Yes"], None, "any")
+            figures_html = vis.to_html(full_html=False, include_plotlyjs="directory") + bookspermonth.to_html(full_html=False, include_plotlyjs=False)
+        StaticExport.write_page(folder, name, listing_page(snap, rows, page, page_count, figures_html))
+        written += 1
+
+    removed = [name for name in previous if name not in pages]
+    StaticExport.remove_pages(folder, removed)
+    StaticExport.save_manifest(folder, pages)
+    print(f"Exported {len(df)} books to {folder}: {written} pages written, {len(removed)} removed, {len(pages) - written} unchanged ({time.perf_counter() - started:.1f}s)")
+
+
+def render_static_book_page(book_info):
+    return render_book_page(book_info, home="../index.html")
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    if args.publish:
+        publish_book_log(config_from_args(args).log_path, args.watch_interval)
+        raise SystemExit
+    if args.export:
+        export_site(config_from_args(args).log_path, args.export, args.export_workers)
+        raise SystemExit
+    app = create_app(config_from_args(args))
+    if args.memory_report:
+        memory_report(current_snapshot().df)
+    app.run(debug=True)
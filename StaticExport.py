@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from html import escape
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+from dash.development.base_component import Component
+
+"""
+==================================================
+Static site export
+==================================================
+Writes a read-only copy of the dashboard as plain HTML files: listing pages
+of the whole log (the first one, index.html, also holds the figures) and one
+page per book under book/. Every page's source is hashed, per row for the
+book pages, and the hashes are kept in manifest.json. A re-export only
+rewrites the pages whose hash changed and deletes the pages of books that
+are gone. Book pages are written by a process pool in chunks.
+"""
+
+# Bump this whenever the page layout changes so the next export rewrites every page
+EXPORT_VERSION = 1
+
+MANIFEST = "manifest.json"
+LISTING_ROWS = 1000  # Books per listing page
+CHUNK_PAGES = 2000  # Book pages handed to a pool worker at a time
+
+# React prop names that are spelled differently in HTML
+ATTRIBUTE_NAMES = {"className": "class", "htmlFor": "for"}
+VOID_TAGS = {"area", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "wbr"}
+
+
+def row_hashes(df):
+    # One 64 bit hash per row of the source columns, the same value every run
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def combined_hash(*parts):
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        digest.update(np.ascontiguousarray(part).tobytes() if isinstance(part, np.ndarray) else str(part).encode())
+    return digest.hexdigest()
+
+
+def css_name(name):
+    return re.sub(r"([A-Z])", r"-\1", name).lower()  # textAlign -> text-align
+
+
+def component_html(component):
+    # The static HTML for a tree of dash html components, so pages built for Dash can be exported as they are
+    if component is None:
+        return ""
+    if isinstance(component, (list, tuple)):
+        return "".join(component_html(child) for child in component)
+    if not isinstance(component, Component):
+        return escape(str(component))
+    if component._namespace != "dash_html_components":
+        raise TypeError(f"{component._type} has no static HTML version")
+
+    props = component.to_plotly_json()["props"]
+    children = props.pop("children", None)
+    attributes = ""
+    for name, value in props.items():
+        if name == "style":
+            value = "; ".join(f"{css_name(key)}: {item}" for key, item in value.items())
+        attributes += f' {ATTRIBUTE_NAMES.get(name, name.lower())}="{escape(str(value))}"'
+
+    tag = component._type.lower()
+    if tag in VOID_TAGS:
+        return f"<{tag}{attributes}>"
+    return f"<{tag}{attributes}>{component_html(children)}</{tag}>"
+
+
+def html_document(title, body, head=""):
+    return (
+        "<!DOCTYPE html>\n"
+        f'<html lang="en">\n<head>\n<meta charset="utf-8">\n<title>{escape(str(title))}</title>\n{head}</head>\n'
+        f'<body style="font-family: Arial, sans-serif">\n{body}\n</body>\n</html>\n'
+    )
+
+
+def table_html(records, columns, link_column=None):
+    # records as update_table sends them, the link column holds a page address rather than Markdown
+    header = "".join(f"<th>{escape(column['name'])}</th>" for column in columns)
+    rows = []
+    for record in records:
+        cells = []
+        for column in columns:
+            value = record[column["id"]]
+            if column["id"] == link_column:
+                cells.append(f'<td><a href="{escape(value)}">{escape(column["name"])}</a></td>')
+            else:
+                cells.append(f"<td>{'' if pd.isna(value) else escape(str(value))}</td>")
+        rows.append(f"<tr>{''.join(cells)}</tr>")
+    return (
+        '<table style="width: 80%; margin: auto; border-collapse: collapse; text-align: center">\n'
+        f"<thead><tr>{header}</tr></thead>\n<tbody>\n" + "\n".join(rows) + "\n</tbody>\n</table>"
+    )
+
+
+def write_page(folder, name, text):
+    # Written next to the old page and swapped in, so a reader never sees half a page
+    path = os.path.join(folder, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as page:
+        page.write(text)
+    os.replace(path + ".tmp", path)
+
+
+def write_book_pages(folder, render, books, names):
+    # Runs in a pool process: render(book) returns the page as dash html components
+    for book, name in zip(books.to_dict("records"), names):  # One pass over the chunk rather than a Series per row
+        write_page(folder, name, html_document(book["Book"], component_html(render(book))))
+    return len(names)
+
+
+def load_manifest(folder):
+    try:
+        with open(os.path.join(folder, MANIFEST), encoding="utf-8") as manifest:
+            manifest = json.load(manifest)
+    except (OSError, ValueError):
+        return {}
+    # Pages from an older layout are all out of date
+    return manifest["pages"] if manifest.get("version") == EXPORT_VERSION else {}
+
+
+def save_manifest(folder, pages):
+    write_page(folder, MANIFEST, json.dumps({"version": EXPORT_VERSION, "pages": pages}, indent=0, sort_keys=True))
+
+
+def export_book_pages(folder, books, names, hashes, render, previous, max_workers=None):
+    # Only the books whose row hash changed, or whose page is missing, are rendered again
+    stale = np.array(
+        [previous.get(name) != digest or not os.path.exists(os.path.join(folder, name)) for name, digest in zip(names, hashes)],
+        dtype=bool,
+    )
+    rows = np.flatnonzero(stale)
+    chunks = [rows[start:start + CHUNK_PAGES] for start in range(0, len(rows), CHUNK_PAGES)]
+    workers = min(len(chunks), max_workers or os.cpu_count() or 1)
+
+    if workers <= 1:
+        return sum(write_book_pages(folder, render, books.iloc[chunk], [names[row] for row in chunk]) for chunk in chunks)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        written = pool.map(
+            write_book_pages, repeat(folder), repeat(render),
+            (books.iloc[chunk] for chunk in chunks), ([names[row] for row in chunk] for chunk in chunks),
+        )
+        return sum(written)
+
+
+def remove_pages(folder, names):
+    for name in names:
+        try:
+            os.remove(os.path.join(folder, name))
+        except FileNotFoundError:
+            pass
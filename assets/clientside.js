@@ -0,0 +1,328 @@
+/*
+==================================================
+Clientside filtering for LocalBookTracker.py --clientside
+==================================================
+The book-store payload is built by clientside_payload() in LocalBookTracker.py.
+These functions mirror update_table and update_vis so the home page filters
+without a server round trip.
+*/
+
+(function () {
+    var MONTH_ABBREVIATIONS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"];
+
+    function everything(size) {
+        return new Uint8Array(size).fill(1);
+    }
+
+    // Codes of the selected values, unknown values simply match nothing
+    function selectedCodes(categories, values) {
+        var codes = new Set();
+        (values || []).forEach(function (value) {
+            var code = categories.indexOf(value);
+            if (code >= 0) {
+                codes.add(code);
+            }
+        });
+        return codes;
+    }
+
+    function anyOf(column, values, size) {
+        var codes = selectedCodes(column.categories, values);
+        var mask = new Uint8Array(size);
+        for (var row = 0; row < size; row++) {
+            mask[row] = codes.has(column.codes[row]) ? 1 : 0;
+        }
+        return mask;
+    }
+
+    function yearsIn(years, values, size) {
+        var selected = new Set(values || []);
+        var mask = new Uint8Array(size);
+        for (var row = 0; row < size; row++) {
+            mask[row] = years[row] !== null && selected.has(years[row]) ? 1 : 0;
+        }
+        return mask;
+    }
+
+    function genreMask(store, genres, match) {
+        var codes = Array.from(selectedCodes(store.genres.categories, genres));
+        var all = match === "all";
+        var mask = new Uint8Array(store.size);
+
+        if (all && codes.length < genres.length) {
+            return mask;  // A genre nobody has, so no book has all of them
+        }
+        for (var row = 0; row < store.size; row++) {
+            var books = store.genres.lists[row];
+            mask[row] = all
+                ? (codes.every(function (code) { return books.indexOf(code) >= 0; }) ? 1 : 0)
+                : (codes.some(function (code) { return books.indexOf(code) >= 0; }) ? 1 : 0);
+        }
+        return mask;
+    }
+
+    function pickerDay(value) {
+        if (!value) {
+            return null;
+        }
+        var parts = value.slice(0, 10).split("-").map(Number);
+        return Date.UTC(parts[0], parts[1] - 1, parts[2]) / 86400000;
+    }
+
+    // Books read at any point in the period, like DateIntervalIndex.overlapping() on the server
+    function dateOverlap(store, startDate, endDate) {
+        var first = pickerDay(startDate), last = pickerDay(endDate);
+        var starts = store.days["Start Date"], ends = store.days["End Date"];
+        var mask = new Uint8Array(store.size);
+        for (var row = 0; row < store.size; row++) {
+            var start = starts[row] !== null ? starts[row] : ends[row];
+            var end = ends[row] !== null ? ends[row] : Infinity;  // Still reading
+            mask[row] = start !== null && (last === null || start <= last) && (first === null || end >= first) ? 1 : 0;
+        }
+        return mask;
+    }
+
+    function and(mask, other) {
+        for (var row = 0; row < mask.length; row++) {
+            mask[row] &= other[row];
+        }
+        return mask;
+    }
+
+    function or(mask, other) {
+        var result = new Uint8Array(mask.length);
+        for (var row = 0; row < mask.length; row++) {
+            result[row] = mask[row] | other[row];
+        }
+        return result;
+    }
+
+    function formatDay(day) {
+        if (day === null) {
+            return null;
+        }
+        var date = new Date(day * 86400000);
+        var dayOfMonth = String(date.getUTCDate()).padStart(2, "0");
+        return MONTH_ABBREVIATIONS[date.getUTCMonth()] + " " + dayOfMonth + ", " + date.getUTCFullYear();
+    }
+
+    // Sort keys per table column: categoricals by code, dates by day number, text as is
+    function sortKey(store, column) {
+        switch (column) {
+            case "Status":
+                return store.categorical.Status.codes.map(function (code) { return code < 0 ? null : code; });
+            case "Rating":
+                return store.rating;
+            case "Start Date":
+            case "End Date":
+                return store.days[column];
+            default:
+                return store.text[column];
+        }
+    }
+
+    function sortRows(store, rows, sortBy) {
+        var key = sortKey(store, sortBy.column_id);
+        var direction = sortBy.direction === "desc" ? -1 : 1;
+
+        // Like the server's sort orders: ties follow the sort direction in log order (descending
+        // sorts reverse them), and missing values stay at the bottom in log order
+        return rows.slice().sort(function (a, b) {
+            var left = key[a], right = key[b];
+            if (left === null || right === null) {
+                return (left === null) - (right === null) || a - b;
+            }
+            return left < right ? -direction : (left > right ? direction : direction * (a - b));
+        });
+    }
+
+    function tableRow(store, row) {
+        return {
+            "Status": store.categorical.Status.categories[store.categorical.Status.codes[row]],
+            "Book": store.text.Book[row],
+            "Author": store.text.Author[row],
+            "Rating": store.rating[row],
+            "Recommended By": store.text["Recommended By"][row],
+            "Start Date": formatDay(store.days["Start Date"][row]),
+            "End Date": formatDay(store.days["End Date"][row]),
+            "Book Link": "[More Info](" + store.home + "book/" + store.slugs[row] + ")"
+        };
+    }
+
+    function triggeredByTable() {
+        var triggered = window.dash_clientside.callback_context.triggered || [];
+        return triggered.every(function (trigger) {
+            return trigger.prop_id.indexOf("MainBookTable.") === 0;
+        });
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        books: {
+            filterTable: function (store, statusValues, recValues, selectedYears, selectedMonths, selectedGenres,
+                                   genreMatch, startDate, endDate, searchHits, pageCurrent, pageSize, sortBy) {
+                var size = store.size;
+
+                // Filter by Status and Recommendation
+                var mask = anyOf(store.categorical.Status, statusValues, size);
+                if (recValues && recValues.length) {
+                    and(mask, anyOf(store.categorical["Rec?"], recValues, size));
+                }
+
+                // Filter by Year (Optional)
+                var startYears, endYears;
+                if (selectedYears && selectedYears.length) {
+                    startYears = yearsIn(store.years["Start Year"], selectedYears, size);
+                    endYears = yearsIn(store.years["End Year"], selectedYears, size);
+                    and(mask, or(startYears, endYears));
+                }
+
+                // Filter by Month, paired with the years when years are selected
+                if (selectedMonths && selectedMonths.length) {
+                    var startMonths = anyOf(store.categorical["Start Month"], selectedMonths, size);
+                    var endMonths = anyOf(store.categorical["End Month"], selectedMonths, size);
+                    if (startYears) {
+                        and(mask, or(and(startMonths, startYears), and(endMonths, endYears)));
+                    } else {
+                        and(mask, or(startMonths, endMonths));
+                    }
+                }
+
+                if (selectedGenres && selectedGenres.length) {
+                    and(mask, genreMask(store, selectedGenres, genreMatch));
+                }
+                if (startDate || endDate) {
+                    and(mask, dateOverlap(store, startDate, endDate));
+                }
+
+                // Search runs on the server, hits from an older data version are ignored
+                var rows = [];
+                var searching = searchHits && searchHits.version === store.version;
+                if (searching) {
+                    rows = searchHits.rows.filter(function (row) { return mask[row]; });
+                } else {
+                    for (var row = 0; row < size; row++) {
+                        if (mask[row]) {
+                            rows.push(row);
+                        }
+                    }
+                }
+                // Like sortable() on the server, the link column has no sort order
+                sortBy = (sortBy || []).filter(function (entry) { return store.sort_columns.indexOf(entry.column_id) >= 0; });
+                if (sortBy.length) {
+                    rows = sortRows(store, rows, sortBy[0]);
+                }
+
+                var pageCount = Math.max(1, Math.ceil(rows.length / pageSize));
+                if (!triggeredByTable()) {
+                    pageCurrent = 0;
+                }
+                pageCurrent = Math.min(pageCurrent || 0, pageCount - 1);
+
+                var data = rows.slice(pageCurrent * pageSize, (pageCurrent + 1) * pageSize).map(function (row) {
+                    return tableRow(store, row);
+                });
+                return [data, pageCount, pageCurrent];
+            },
+
+            booksPerMonth: function (store, statusValues, recValues, genreValues, genreMatch) {
+                var size = store.size;
+                var active = function (values) { return values && values.length && values.indexOf("All") < 0; };
+                var mask = everything(size);
+
+                if (active(statusValues)) {
+                    and(mask, anyOf(store.categorical.Status, statusValues, size));
+                }
+                if (active(recValues)) {
+                    and(mask, anyOf(store.categorical["Rec?"], recValues, size));
+                }
+                if (active(genreValues)) {
+                    and(mask, genreMask(store, genreValues, genreMatch));
+                }
+
+                // Months since 1970 of each finished book, then every month from the first to the last
+                var counts = {}, first = Infinity, last = -Infinity;
+                var ends = store.days["End Date"];
+                for (var row = 0; row < size; row++) {
+                    if (mask[row] && ends[row] !== null) {
+                        var date = new Date(ends[row] * 86400000);
+                        var month = (date.getUTCFullYear() - 1970) * 12 + date.getUTCMonth();
+                        counts[month] = (counts[month] || 0) + 1;
+                        first = Math.min(first, month);
+                        last = Math.max(last, month);
+                    }
+                }
+
+                var x = [], y = [];
+                for (var month = first; month <= last; month++) {
+                    var year = 1970 + Math.floor(month / 12), monthOfYear = month - (year - 1970) * 12 + 1;
+                    x.push(year + "-" + String(monthOfYear).padStart(2, "0") + "-01");
+                    y.push(counts[month] || 0);  // Months without a finished book stay on the line at zero
+                }
+
+                var figure = JSON.parse(JSON.stringify(store.bookspermonth));
+                figure.data[0].x = x;
+                figure.data[0].y = y;
+                return figure;
+            },
+
+            ratingsHistogram: function (store, recValues, yearValues, monthValues, genreValues, genreMatch, startDate, endDate) {
+                var size = store.size;
+                var active = function (values) { return values && values.length && values.indexOf("All") < 0; };
+                var mask = everything(size);
+
+                if (active(recValues)) {
+                    and(mask, anyOf(store.categorical["Rec?"], recValues, size));
+                }
+                if (active(yearValues)) {
+                    and(mask, or(yearsIn(store.years["Start Year"], yearValues, size),
+                                 yearsIn(store.years["End Year"], yearValues, size)));
+                }
+                if (active(monthValues)) {
+                    and(mask, or(anyOf(store.categorical["Start Month"], monthValues, size),
+                                 anyOf(store.categorical["End Month"], monthValues, size)));
+                }
+                if (genreValues && genreValues.length) {
+                    and(mask, genreMask(store, genreValues, genreMatch));
+                }
+                if (startDate || endDate) {
+                    and(mask, dateOverlap(store, startDate, endDate));
+                }
+
+                // Right closed half point bins, the same as rating_bins() on the server
+                var bins = store.rating_bins;
+                var counts = new Array(bins.count).fill(0);
+                for (var row = 0; row < size; row++) {
+                    var rating = store.rating[row];
+                    if (mask[row] && rating !== null) {
+                        var bin = Math.min(Math.max(Math.ceil(rating / bins.width) - 1, 0), bins.count - 1);
+                        counts[bin] += 1;
+                    }
+                }
+
+                var x = [], y = [], colors = [], edges = [];
+                counts.forEach(function (count, bin) {
+                    if (count > 0) {
+                        var lower = bin * bins.width, upper = lower + bins.width;
+                        x.push(lower + bins.width / 2);
+                        y.push(count);
+                        edges.push([lower, upper]);
+                        colors.push(upper <= 5 ? bins.colors.Low : (upper <= 7 ? bins.colors.Medium : bins.colors.High));
+                    }
+                });
+
+                return {
+                    data: [{
+                        type: "bar",
+                        x: x,
+                        y: y,
+                        width: bins.width,
+                        marker: {color: colors},
+                        customdata: edges,
+                        hovertemplate: "Rating: %{customdata[0]}-%{customdata[1]}<br>Books: %{y}<extra></extra>"
+                    }],
+                    layout: store.histogram_layout
+                };
+            }
+        }
+    });
+})();
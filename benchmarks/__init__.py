@@ -0,0 +1,11 @@
+"""
+==================================================
+Benchmarks for LocalBookTracker.py
+==================================================
+generate.py writes synthetic Book Log workbooks of any size and run.py times
+startup, update_table, update_vis, update_bookspermonth and display_page
+against them, writing the results as JSON so runs on different commits can be
+compared.
+
+    python -m benchmarks.run --sizes 1000 10000 100000
+"""
@@ -0,0 +1,133 @@
+import argparse
+import os
+
+import numpy as np
+from openpyxl import Workbook
+
+# Same columns, in the same order, as the Book Tracker sheet in Book Log.xlsx
+COLUMNS = [
+    "Rating", "Book", "Author", "Status", "Rec?", "Recommended By", "Start Date", "End Date",
+    "Summary", "Core Themes", "Review", "What I gained from reading", "Story behind finding the book",
+    "Genre", "Personal Collection?", "Series/Standalone?", "Page Ct.", "M-Y",
+]
+
+GENRES = [
+    "Fiction", "Non-Fiction", "Sci-Fi", "Fantasy", "Dystopian", "Philosophy", "Poetry", "History",
+    "Biography", "Self-Help", "Business", "Economics", "Psychology", "Religion", "Mystery", "Thriller",
+    "Romance", "Classic", "Politics", "Science",
+]
+
+WORDS = (
+    "life love power freedom truth story journey war peace family friend mind habit money time "
+    "world people history future past courage fear hope faith reason nature art music city king "
+    "empire revolution science discovery memory loss growth change wisdom patience discipline "
+    "leader society culture identity purpose meaning happiness struggle success failure book "
+    "character plot author reader chapter idea lesson insight perspective question answer"
+).split()
+
+STATUSES = ["Complete", "Reading", "To Be Read"]
+COLLECTION = ["In Collection", "Future Possibility", "Borrowed", "Library"]
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def sentences(rng, rows, low, high):
+    lengths = rng.integers(low, high, size=rows)
+    words = rng.choice(WORDS, size=lengths.sum())
+    ends = np.cumsum(lengths)
+    return [" ".join(words[end - length:end]).capitalize() + "." for end, length in zip(ends, lengths)]
+
+
+def synthetic_rows(rows, seed=0):
+    rng = np.random.default_rng(seed)
+
+    status = rng.choice(STATUSES, size=rows, p=[0.6, 0.1, 0.3])
+    started = np.datetime64("2015-01-01") + rng.integers(0, 365 * 10, size=rows).astype("timedelta64[D]")
+    finished = started + rng.integers(3, 120, size=rows).astype("timedelta64[D]")
+    rating = np.round(rng.uniform(3, 10, size=rows), 1)
+    pages = rng.integers(80, 1200, size=rows)
+
+    genre_counts = rng.integers(1, 4, size=rows)
+    genre_picks = rng.integers(0, len(GENRES), size=(rows, 3))
+    genres = [", ".join(dict.fromkeys(GENRES[g] for g in picks[:count])) for picks, count in zip(genre_picks, genre_counts)]
+
+    # Titles repeat now and then, like re-reads and books that share a name
+    titles = [f"The {WORDS[a].title()} of {WORDS[b].title()} {number}" for a, b, number in zip(
+        rng.integers(0, len(WORDS), size=rows), rng.integers(0, len(WORDS), size=rows), rng.integers(0, rows // 2 + 1, size=rows)
+    )]
+    authors = [f"Author {number}" for number in rng.integers(0, max(rows // 5, 1), size=rows)]
+
+    rec = np.where(rng.random(rows) < 0.4, "Yes", "No")
+    recommended_by = np.where(rng.random(rows) < 0.5, "-", np.char.add("Friend ", rng.integers(0, 50, size=rows).astype(str)))
+    collection = rng.choice(COLLECTION, size=rows)
+    series = np.where(
+        rng.random(rows) < 0.7, "Standalone",
+        np.char.add(np.char.add("Series: ", np.char.capitalize(rng.choice(WORDS, size=rows))), " Saga"),
+    )
+
+    summaries = sentences(rng, rows, 40, 160)
+    themes = sentences(rng, rows, 3, 10)
+    reviews = sentences(rng, rows, 40, 200)
+    gained = sentences(rng, rows, 10, 60)
+    stories = sentences(rng, rows, 5, 30)
+
+    for row in range(rows):
+        complete = status[row] == "Complete"
+        reading = status[row] == "Reading"
+        start = started[row].item() if complete or reading else None
+        end = finished[row].item() if complete else None
+        yield [
+            rating[row] if complete else None,
+            titles[row],
+            authors[row],
+            status[row],
+            rec[row],
+            recommended_by[row],
+            start,
+            end,
+            summaries[row],
+            themes[row],
+            reviews[row] if complete else None,
+            gained[row] if complete else None,
+            stories[row],
+            genres[row],
+            collection[row],
+            series[row],
+            pages[row],
+            end.strftime("%Y-%m") if end else None,
+        ]
+
+
+def generate(path, rows, seed=0):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    # Write only mode streams rows to disk instead of holding the whole sheet
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Book Tracker")
+    sheet.append(COLUMNS)
+    for row in synthetic_rows(rows, seed):
+        sheet.append(row)
+    workbook.save(path)
+    return path
+
+
+def workbook_path(folder, rows):
+    return os.path.join(folder, f"Book Log {rows}.xlsx")
+
+
+def ensure_workbook(folder, rows, seed=0):
+    path = workbook_path(folder, rows)
+    if not os.path.exists(path):
+        print(f"Generating {path}...")
+        generate(path, rows, seed)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic Book Log workbooks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="Row counts to generate")
+    parser.add_argument("--folder", default=os.path.join(os.path.dirname(__file__), "data"), help="Where to write the workbooks")
+    parser.add_argument("--seed", type=int, default=0)
+    options = parser.parse_args()
+
+    for size in options.sizes:
+        generate(workbook_path(options.folder, size), size, options.seed)
@@ -0,0 +1,227 @@
+import argparse
+import gzip
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from benchmarks.generate import SIZES, ensure_workbook
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Filter states a typical session goes through on the home page
+TABLE_SCENARIOS = {
+    "default": dict(status_values=["Complete"], rec_values=["Yes"], selected_years=None, selected_months=None),
+    "all statuses": dict(status_values=["Complete", "Reading", "To Be Read"], rec_values=None, selected_years=None, selected_months=None),
+    "year and months": dict(status_values=["Complete"], rec_values=None, selected_years=[2020, 2021], selected_months=["January", "July"]),
+    "genres, all of": dict(status_values=["Complete", "Reading"], rec_values=None, selected_years=None, selected_months=None, selected_genres=["Fiction", "Sci-Fi"], genre_match="all"),
+    "date range": dict(status_values=["Complete", "Reading"], rec_values=None, selected_years=None, selected_months=None, start_date="2020-03-01", end_date="2020-05-31"),
+    "search": dict(status_values=["Complete", "Reading", "To Be Read"], rec_values=None, selected_years=None, selected_months=None, search_query="freedom revol"),
+    "sorted by date": dict(status_values=["Complete"], rec_values=None, selected_years=None, selected_months=None, sort_by=[{"column_id": "End Date", "direction": "desc"}]),
+}
+
+VIS_SCENARIOS = {
+    "no filters": dict(rec_values=None, year_values=None, month_values=None),
+    "rec and year": dict(rec_values=["Yes"], year_values=[2020], month_values=None),
+    "year and months": dict(rec_values=["Yes", "No"], year_values=[2019, 2020, 2021], month_values=["March", "April"]),
+    "genres": dict(rec_values=None, year_values=None, month_values=None, genre_values=["Fantasy", "History"], genre_match="any"),
+    "date range": dict(rec_values=None, year_values=None, month_values=None, start_date="2020-03-01", end_date="2020-05-31"),
+}
+
+MONTH_SCENARIOS = {
+    "default": dict(status_values=["Complete"], rec_values=["Yes"], genre_values=None, genre_match="any"),
+    "genres, all of": dict(status_values=None, rec_values=None, genre_values=["Fiction", "Sci-Fi"], genre_match="all"),
+}
+
+
+def timed(function, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    return {"median_ms": statistics.median(times) * 1000, "min_ms": min(times) * 1000, "repeat": repeat}
+
+
+def table_call(tracker, scenario):
+    arguments = dict(selected_genres=None, genre_match="any", start_date=None, end_date=None, search_query=None, page_current=0, page_size=tracker.PAGE_SIZE, sort_by=[])
+    arguments.update(scenario)
+    return lambda: tracker.update_table(**arguments)
+
+
+def vis_arguments(scenario):
+    arguments = dict(genre_values=None, genre_match="any", start_date=None, end_date=None)
+    arguments.update(scenario)
+    return arguments
+
+
+def vis_call(tracker, scenario):
+    arguments = vis_arguments(scenario)
+
+    def call():
+        tracker.figures.clear()  # Time building the figure, not the figure cache
+        tracker.update_vis(**arguments)
+    return call
+
+
+def month_call(tracker, scenario):
+    def call():
+        tracker.month_counts.clear()  # Time counting, not the count cache
+        tracker.update_bookspermonth(**scenario)
+    return call
+
+
+def book_page_call(tracker, slugs):
+    def call():
+        tracker.book_pages.clear()
+        for slug in slugs:
+            tracker.display_page(f"/book/{slug}")
+    return call
+
+
+def payload_bytes(tracker, value):
+    # The JSON Dash sends for a callback result, and what gzip and brotli (when installed) make of it
+    from plotly.io.json import to_json_plotly
+
+    body = to_json_plotly(value).encode()
+    sizes = {"raw": len(body), "gzip": len(gzip.compress(body, compresslevel=6))}
+    if tracker.brotli is not None:
+        sizes["br"] = len(tracker.brotli.compress(body, quality=5))
+    sizes["saved"] = sizes["raw"] - min(size for encoding, size in sizes.items() if encoding != "raw")
+    return sizes
+
+
+def table_payloads(tracker, snap, scenario):
+    records = table_call(tracker, scenario)()[0]
+    sizes = payload_bytes(tracker, records)
+
+    # What the same page would weigh with every column of the log, as the table used to get them
+    positions = [snap.slug_index.get(record["Book Link"].split("/book/")[1][:-1]) for record in records]
+    sizes["all_columns_raw"] = len(snap.df.iloc[positions].to_json(orient="records", date_format="iso").encode())
+    return sizes
+
+
+def benchmark_size(tracker, path, repeat, version):
+    import pandas as pd
+
+    result = {"rows": None, "workbook": os.path.basename(path), "startup": {}, "update_table": {}, "update_vis": {}, "update_bookspermonth": {}, "display_page": {}, "payload_bytes": {}}
+
+    # Startup: the cold path reads the workbook, the warm path reads the Feather cache
+    started = time.perf_counter()
+    raw = pd.read_excel(path)
+    result["startup"]["read_excel_ms"] = (time.perf_counter() - started) * 1000
+    del raw
+
+    # What load_book_log() uses: openpyxl's read-only rows, only the log columns, typed in chunks
+    started = time.perf_counter()
+    raw = tracker.BookLogReader.read_book_log(path)
+    result["startup"]["read_stream_ms"] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    df = tracker.preprocess(raw)
+    result["startup"]["preprocess_ms"] = (time.perf_counter() - started) * 1000
+
+    tracker.write_cache(path, df)
+    started = time.perf_counter()
+    cached = tracker.read_cache(path)
+    result["startup"]["read_cache_ms"] = (time.perf_counter() - started) * 1000 if cached is not None else None
+
+    # The search index is the slowest part of a snapshot, so it is timed on its own and left out of build_snapshot_ms
+    key = tracker.workbook_key(path)
+    started = time.perf_counter()
+    search_index = tracker.SearchIndex(df)
+    result["startup"]["search_index_ms"] = (time.perf_counter() - started) * 1000
+
+    tracker.write_search_cache(path, key, search_index)
+    started = time.perf_counter()
+    cached = tracker.read_search_cache(path, key)
+    result["startup"]["read_search_cache_ms"] = (time.perf_counter() - started) * 1000 if cached is not None else None
+
+    started = time.perf_counter()
+    snap = tracker.build_snapshot(df, version, key, search_index=search_index)
+    result["startup"]["build_snapshot_ms"] = (time.perf_counter() - started) * 1000
+    result["rows"] = len(snap.df)
+
+    # The callbacks read the module global, so point it at this workbook's data
+    tracker.snapshot = snap
+    tracker.book_pages.clear()
+    tracker.figures.clear()
+    tracker.month_counts.clear()
+
+    for name, scenario in TABLE_SCENARIOS.items():
+        result["update_table"][name] = timed(table_call(tracker, scenario), repeat)
+    for name, scenario in VIS_SCENARIOS.items():
+        result["update_vis"][name] = timed(vis_call(tracker, scenario), repeat)
+    for name, scenario in MONTH_SCENARIOS.items():
+        result["update_bookspermonth"][name] = timed(month_call(tracker, scenario), repeat)
+
+    all_slugs = snap.df["Book Link"].str.slice(len("/book/"))
+    slugs = list(all_slugs.iloc[::max(len(all_slugs) // 10, 1)][:10])
+    result["display_page"]["home"] = timed(lambda: tracker.display_page("/"), repeat)
+    result["display_page"]["10 book pages"] = timed(book_page_call(tracker, slugs), repeat)
+
+    # Bytes on the wire per response, uncompressed and compressed
+    for name, scenario in TABLE_SCENARIOS.items():
+        result["payload_bytes"][f"update_table: {name}"] = table_payloads(tracker, snap, scenario)
+    for name, scenario in VIS_SCENARIOS.items():
+        result["payload_bytes"][f"update_vis: {name}"] = payload_bytes(tracker, tracker.update_vis(**vis_arguments(scenario)))
+    for name, scenario in MONTH_SCENARIOS.items():
+        result["payload_bytes"][f"update_bookspermonth: {name}"] = payload_bytes(tracker, tracker.update_bookspermonth(**scenario))
+    result["payload_bytes"]["display_page: home"] = payload_bytes(tracker, tracker.display_page("/"))
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LocalBookTracker.py on synthetic book logs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="Row counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per timing, the median is reported")
+    parser.add_argument("--folder", default=os.path.join(HERE, "data"), help="Where the synthetic workbooks are kept")
+    parser.add_argument("--output", help="JSON file to write, defaults to benchmarks/results/<timestamp>-<commit>.json")
+    options = parser.parse_args()
+
+    paths = {size: ensure_workbook(options.folder, size) for size in options.sizes}
+
+    # Nothing is loaded at import or app creation, each size's snapshot is built and swapped in below
+    started = time.perf_counter()
+    import LocalBookTracker as tracker
+    import_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    tracker.create_app(tracker.Config(log_path=paths[min(paths)], watch_interval=0, warm=False))
+    create_app_ms = (time.perf_counter() - started) * 1000
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "import_ms": import_ms,
+        "create_app_ms": create_app_ms,
+        "results": [],
+    }
+    for version, (size, path) in enumerate(sorted(paths.items()), start=1):
+        print(f"Benchmarking {size:,} rows...")
+        report["results"].append(benchmark_size(tracker, path, options.repeat, version))
+
+    output = options.output or os.path.join(
+        HERE, "results", f"{datetime.now():%Y%m%d-%H%M%S}-{(commit or 'unknown')[:8]}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
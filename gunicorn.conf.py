@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+
+# gunicorn reads this file from the working directory:
+#     BOOK_LOG="path/to/Book Log.xlsx" gunicorn
+# The master starts one loader process that publishes the snapshot, the workers map it.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+wsgi_app = "wsgi:server"
+bind = os.environ.get("BIND", "127.0.0.1:8050")
+workers = int(os.environ.get("WEB_CONCURRENCY", 4))
+threads = int(os.environ.get("THREADS", 2))
+preload_app = False  # Each worker imports the app itself, the data is shared through the mapped snapshot
+
+
+def on_starting(server):
+    command = [sys.executable, os.path.join(HERE, "LocalBookTracker.py"), "--publish",
+               "--watch-interval", os.environ.get("WATCH_INTERVAL", "5")]
+    server.book_log_loader = subprocess.Popen(command)
+
+
+def on_exit(server):
+    server.book_log_loader.terminate()
+    server.book_log_loader.wait()
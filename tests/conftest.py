@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import BookLogReader  # noqa: E402
+import LocalBookTracker  # noqa: E402
+
+
+def book(title, author="Author", status="Complete", rec="Yes", rating=8.0, start="2024-01-05", end="2024-02-10", genre="Fiction", pages=300):
+    return {
+        "Rating": rating, "Book": title, "Author": author, "Status": status, "Rec?": rec,
+        "Recommended By": "Friend", "Start Date": pd.Timestamp(start) if start else None,
+        "End Date": pd.Timestamp(end) if end else None, "Summary": f"Summary of {title}",
+        "Core Themes": "Themes", "Review": "Review", "What I gained from reading": "Gained",
+        "Story behind finding the book": "Story", "Genre": genre, "Personal Collection?": "Yes",
+        "Series/Standalone?": "Standalone", "Page Ct.": pages,
+    }
+
+
+def write_book_log(path, books):
+    previous = os.stat(path).st_mtime_ns if os.path.exists(path) else None
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pd.DataFrame(books, columns=BookLogReader.LOG_COLUMNS).to_excel(path, index=False)
+    if previous is not None:  # A rewrite within the same clock tick still has to look changed
+        os.utime(path, ns=(previous + 10**9, previous + 10**9))
+
+
+@pytest.fixture
+def tracker():
+    yield LocalBookTracker
+    LocalBookTracker.book_pages.clear()
+    LocalBookTracker.figures.clear()
@@ -0,0 +1,17 @@
+import os
+
+from benchmarks.generate import ensure_workbook
+from benchmarks.run import benchmark_size
+
+
+def test_benchmark_runs_on_a_small_log(tmp_path, tracker):
+    path = ensure_workbook(str(tmp_path), 50)
+    tracker.create_app(tracker.Config(log_path=path, watch_interval=0, warm=False))
+
+    result = benchmark_size(tracker, path, 1, 1)
+
+    assert result["rows"] == 50
+    assert result["workbook"] == os.path.basename(path)
+    assert set(result["display_page"]) == {"home", "10 book pages"}
+    assert result["startup"]["search_index_ms"] > 0 and result["startup"]["read_search_cache_ms"] is not None
+    assert all(sizes["all_columns_raw"] >= sizes["raw"] for name, sizes in result["payload_bytes"].items() if name.startswith("update_table"))
@@ -0,0 +1,31 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+from conftest import book, write_book_log
+
+
+def test_cache_keeps_text_in_the_mapped_file(tmp_path, tracker):
+    path = os.path.join(tmp_path, "Book Log.xlsx")
+    write_book_log(path, [book(f"Book {n}") | {"Review": "A long review. " * 200} for n in range(200)])
+
+    loaded = tracker.load_book_log(path)
+    assert os.path.exists(tracker.cache_path(path))
+
+    allocated = pa.total_allocated_bytes()
+    cached = tracker.read_cache(path)
+    pd.testing.assert_frame_equal(cached, loaded)
+
+    # The reviews alone are about 600 KB, none of it should be copied out of the mapping
+    assert pa.total_allocated_bytes() - allocated < cached["Review"].str.len().sum() // 10
+
+
+def test_cache_is_ignored_once_the_workbook_changes(tmp_path, tracker):
+    path = os.path.join(tmp_path, "Book Log.xlsx")
+    write_book_log(path, [book("First")])
+    tracker.load_book_log(path)
+
+    write_book_log(path, [book("Second")])
+    assert tracker.read_cache(path) is None
+    assert list(tracker.load_book_log(path)["Book"]) == ["Second"]
@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+from plotly.io.json import to_json_plotly
+
+from conftest import book, write_book_log
+
+ASSETS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "clientside.js")
+
+# Loads assets/clientside.js the way the browser does and runs filterTable for each call on stdin
+RUNNER = """
+global.window = {dash_clientside: {callback_context: {triggered: [{prop_id: "MainBookTable.page_current"}]}}};
+require(process.argv[1]);
+const {store, calls} = JSON.parse(require("fs").readFileSync(0, "utf8"));
+console.log(JSON.stringify(calls.map(args => window.dash_clientside.books.filterTable(store, ...args))));
+"""
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="needs node to run assets/clientside.js")
+
+
+def filter_table(store, calls):
+    result = subprocess.run(
+        ["node", "-e", RUNNER, ASSETS], input=json.dumps({"store": store, "calls": calls}),
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout)
+
+
+@pytest.fixture
+def clientside(tmp_path, tracker):
+    path = os.path.join(tmp_path, "Book Log.xlsx")
+    write_book_log(path, [
+        book("Cedar", author="Bea", rating=7.0),
+        book("Aspen", author="Cal", rating=9.0, status="Reading", end=None),
+        book("Birch", author="Ada", rating=None),
+    ])
+    tracker.create_app(tracker.Config(log_path=path, clientside=True, watch_interval=0, warm=False))
+    return json.loads(to_json_plotly(tracker.current_snapshot().clientside))
+
+
+def test_link_column_sort_is_ignored(clientside, tracker):
+    filters = [["Complete", "Reading"], None, None, None, None, "any", None, None]
+    link_sort = [{"column_id": "Book Link", "direction": "asc"}]
+    hits = tracker.update_search_hits("Aspen")
+
+    (rows, _, _), (searched, _, _) = filter_table(clientside, [filters + [None, 0, 25, link_sort], filters + [hits, 0, 25, link_sort]])
+    assert [row["Book"] for row in rows] == ["Cedar", "Aspen", "Birch"]
+    assert [row["Book"] for row in searched] == [row["Book"] for row in tracker.update_table(*filters, "Aspen", 0, 25, [])[0]]
+
+
+def test_sorted_pages_match_the_server(tmp_path, tracker):
+    # Few distinct values, so most sorts are decided by the tie rule
+    path = os.path.join(tmp_path, "Book Log.xlsx")
+    statuses = ["Complete", "Reading", "To Be Read"]
+    write_book_log(path, [
+        book(
+            f"{['Oak', 'Elm', 'Fir'][n % 3]} {'Story' if n % 4 else 'History'}", author=f"Author {n % 5}",
+            status=statuses[n % 3], rating=[None, 6.0, 8.0, 8.0][n % 4],
+            start=None if n % 7 == 0 else f"2024-0{n % 3 + 1}-01", end=None if n % 5 == 0 else f"2024-0{n % 3 + 4}-01",
+        )
+        for n in range(60)
+    ])
+    tracker.create_app(tracker.Config(log_path=path, clientside=True, watch_interval=0, warm=False))
+    store = json.loads(to_json_plotly(tracker.current_snapshot().clientside))
+
+    calls, expected = [], []
+    for column in tracker.SORT_COLUMNS:
+        for direction in ("asc", "desc"):
+            for search in (None, "history", "oak"):
+                for page in (0, 1):
+                    sort_by = [{"column_id": column, "direction": direction}]
+                    filters = [statuses, None, None, None, None, "any", None, None]
+                    hits = tracker.update_search_hits(search) if search else None
+                    calls.append(filters + [hits, page, 10, sort_by])
+                    expected.append([row["Book Link"] for row in tracker.update_table(*filters, search, page, 10, sort_by)[0]])
+
+    pages = filter_table(store, calls)
+    assert [[row["Book Link"] for row in rows] for rows, _, _ in pages] == expected
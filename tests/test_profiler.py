@@ -0,0 +1,43 @@
+import os
+import threading
+
+import CallbackProfiler
+
+
+class FakeApp:
+    def __init__(self, callbacks):
+        self.callback_map = {callback_id: {"callback": callback} for callback_id, callback in callbacks.items()}
+
+
+def test_concurrent_requests_are_profiled_one_at_a_time(tmp_path):
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "slow response"
+
+    def fast():
+        return "fast response"
+
+    app = FakeApp({"slow.figure": slow, "fast.figure": fast})
+    CallbackProfiler.profile_callbacks(app, str(tmp_path))
+
+    results = {}
+    thread = threading.Thread(target=lambda: results.update(slow=app.callback_map["slow.figure"]["callback"]()))
+    thread.start()
+    assert started.wait(5)
+
+    # Runs while the slow request holds the profiler, a second active profiler is an error from Python 3.12
+    results["fast"] = app.callback_map["fast.figure"]["callback"]()
+    release.set()
+    thread.join(5)
+
+    assert results == {"slow": "slow response", "fast": "fast response"}
+    reports = [name for name in os.listdir(tmp_path) if name.endswith(".pstats")]
+    assert len(reports) == 1 and "slow-figure" in reports[0]
+
+    # Once the profiler is free again the next request is profiled
+    app.callback_map["fast.figure"]["callback"]()
+    assert len([name for name in os.listdir(tmp_path) if name.endswith(".pstats")]) == 2
@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from conftest import book, write_book_log
+
+
+def test_prefix_cap_keeps_the_word_as_typed(tracker):
+    # 70 longer words starting with "ant" pass the prefix cap, and each is more common than "ant" itself
+    books = [book(f"ant{n % 70:03d}") for n in range(140)] + [book("ant")]
+    index = tracker.SearchIndex(pd.DataFrame(books))
+
+    matches, scores = index.search("ant")
+    assert matches[140]
+    assert scores[140] > 0
+
+
+def test_tokenizer_matches_the_pandas_fallback(tracker, monkeypatch):
+    books = [book("Café Society"), book("9to5 end2end", author=None), book(""), book("Straße—naïve, DUNE!")]
+    df = pd.DataFrame(books)
+    df.loc[2, tracker.SEARCH_COLUMNS] = None
+
+    fast = tracker.SearchIndex(df)
+    monkeypatch.setattr(tracker, "pa", None)
+    slow = tracker.SearchIndex(df)
+    for name, value in vars(slow).items():
+        assert np.array_equal(getattr(fast, name), value), name
+
+
+def test_search_index_is_saved_with_the_cache(tmp_path, tracker):
+    path = os.path.join(tmp_path, "Book Log.xlsx")
+    write_book_log(path, [book("Dune"), book("Emma")])
+    built = tracker.load_log_snapshot(path, 1, tracker.workbook_key(path))
+
+    # A warm start maps the saved arrays instead of tokenizing again
+    warm = tracker.load_log_snapshot(path, 2, tracker.workbook_key(path))
+    assert isinstance(warm.search_index.postings, np.memmap)
+    for query in ("dune", "em", "summary"):
+        assert np.array_equal(warm.search_index.search(query)[1], built.search_index.search(query)[1])
+
+    write_book_log(path, [book("Dune"), book("Persuasion")])
+    assert tracker.read_search_cache(path, tracker.workbook_key(path)) is None
+    edited = tracker.load_log_snapshot(path, 3, tracker.workbook_key(path), previous=warm)
+    assert edited.search_index.search("persuasion")[0].tolist() == [False, True]
@@ -0,0 +1,29 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from conftest import book, write_book_log
+
+
+def test_attached_snapshot_matches_the_published_one(tmp_path, tracker):
+    path = os.path.join(tmp_path, "Book Log.xlsx")
+    write_book_log(path, [book("Dune"), book("Dune", author="Someone Else", end=None), book("Émile", rating=None)])
+
+    tracker.create_app(tracker.Config(log_path=path, watch_interval=0, warm=False))
+    published = tracker.current_snapshot()
+    tracker.publish_snapshot(tracker.shared_folder(path), published)
+
+    tracker.create_app(tracker.Config(log_path=path, shared=True, watch_interval=0, warm=False))
+    attached = tracker.current_snapshot()
+
+    # The book page lookup and the table's display columns come from the generation's files
+    assert isinstance(attached.slug_index.slugs, np.memmap)
+    for position, link in enumerate(published.df["Book Link"]):
+        assert attached.slug_index.get(link[len("/book/"):]) == position
+    assert attached.slug_index.get("not-a-book") is None
+    assert attached.slug_index.get("émile") is None
+    pd.testing.assert_frame_equal(attached.table_view, published.table_view, check_dtype=False)
+
+    page = tracker.display_page("/book/dune-2")
+    assert page.children[2].children == "Author: Someone Else"
@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from conftest import book, write_book_log
+
+TABLE_DEFAULTS = (["Complete", "Reading"], None, None, None, None, "any", None, None)
+
+
+@pytest.fixture
+def book_log(tmp_path):
+    path = os.path.join(tmp_path, "Book Log.xlsx")
+    write_book_log(path, [
+        book("Cedar", author="Bea", rating=7.0),
+        book("Aspen", author="Cal", rating=9.0, status="Reading", end=None),
+        book("Birch", author="Ada", rating=None),
+    ])
+    return path
+
+
+def test_link_column_sort_is_ignored(book_log, tracker):
+    tracker.create_app(tracker.Config(log_path=book_log, watch_interval=0, warm=False))
+    link_sort = [{"column_id": "Book Link", "direction": "asc"}]
+
+    rows, page_count, _ = tracker.update_table(*TABLE_DEFAULTS, None, 0, 25, link_sort)
+    assert [row["Book"] for row in rows] == ["Cedar", "Aspen", "Birch"]
+    assert page_count == 1
+
+    # With a search the matches keep their relevance order
+    ranked, _, _ = tracker.update_table(*TABLE_DEFAULTS, "Aspen", 0, 25, [])
+    searched, _, _ = tracker.update_table(*TABLE_DEFAULTS, "Aspen", 0, 25, link_sort)
+    assert searched == ranked
+
+
+def test_link_column_sort_is_ignored_by_the_database(book_log, tmp_path, tracker):
+    tracker.create_app(tracker.Config(log_path=book_log, database=os.path.join(tmp_path, "books.sqlite"), watch_interval=0, warm=False))
+
+    rows, _, _ = tracker.sql_update_table(*TABLE_DEFAULTS, None, 0, 25, [{"column_id": "Book Link", "direction": "desc"}])
+    assert [row["Book"] for row in rows] == ["Cedar", "Aspen", "Birch"]
@@ -0,0 +1,31 @@
+import os
+
+from conftest import book, write_book_log
+
+
+def test_evicted_tenant_sees_edited_log(tmp_path, tracker):
+    alice = os.path.join(tmp_path, "alice", "Book Log.xlsx")
+    bob = os.path.join(tmp_path, "bob", "Book Log.xlsx")
+    write_book_log(alice, [book(f"Alice {n}", author="Old Author", start=f"2024-0{n % 6 + 1}-01", end=f"2024-0{n % 6 + 1}-20", pages=100 + n) for n in range(10)])
+    write_book_log(bob, [book("Bob Book")])
+
+    # A budget this small keeps only the most recently loaded reader
+    tracker.create_app(tracker.Config(log_path=alice, tenants_dir=str(tmp_path), tenant_memory_mb=0.001, watch_interval=0, warm=False))
+
+    status = ["Complete"]
+    analytics_args = (status, None, None, None, None, "any", None, None, None, "/u/alice/")
+    before = tracker.update_bookspermonth(status, None, None, "any", "/u/alice/")
+    assert tracker.display_page("/u/alice/book/alice-1").children[2].children == "Author: Old Author"
+    tracker.update_analytics(*analytics_args)
+
+    tracker.display_page("/u/bob/")
+    assert "alice" not in tracker.tenants.snapshots()
+
+    write_book_log(alice, [book("Alice 1", author="New Author", start="2024-03-01", end="2024-03-20"), book("Alice 2")])
+
+    after = tracker.update_bookspermonth(status, None, None, "any", "/u/alice/")
+    assert sum(after.data[0].y) == 2
+    assert sum(after.data[0].y) != sum(before.data[0].y)
+    assert tracker.display_page("/u/alice/book/alice-1").children[2].children == "Author: New Author"
+    scatter, _ = tracker.update_analytics(*analytics_args)
+    assert len(scatter.data[0].x) == 2
@@ -0,0 +1,8 @@
+import os
+
+from LocalBookTracker import Config, create_app
+
+# Workers map the snapshot published by the loader process (see gunicorn.conf.py)
+# instead of each reading the workbook. BOOK_LOG picks the workbook, like the dev server.
+app = create_app(Config(shared=True, watch_interval=float(os.environ.get("WATCH_INTERVAL", 5))))
+server = app.server